@@ -0,0 +1,111 @@
+import copy
+
+import numpy as np
+
+CUBE_DIMENSIONS = ['job_title_short', 'job_country', 'job_via', 'job_work_from_home', 'job_schedule_type', 'date_only']
+
+
+class JobCube:
+    """Posting counts and salary sums over every observed combination of the dashboard dimensions.
+
+    cell_ids maps each posting to its cell, so a cube over any subset of
+    postings (for example the rows matching a skill selection) is a single
+    bincount rather than a new groupby. With per-row weights the measures
+    are weighted sums, which is how a cube over a sample estimates the
+    full dataset.
+    """
+
+    is_exact = True
+
+    def __init__(self, cells, cell_ids, salaries, weights=None):
+        self.cells = cells
+        self.cell_ids = cell_ids
+        self.salaries = salaries
+        self.weights = weights
+
+    @classmethod
+    def build(cls, df, weights=None):
+        cell_ids = df.groupby(CUBE_DIMENSIONS, observed=True, sort=False, dropna=False).ngroup().to_numpy(np.int32)
+        _, first_rows = np.unique(cell_ids, return_index=True)
+        cells = df[CUBE_DIMENSIONS].iloc[first_rows].reset_index(drop=True)
+        salaries = df['salary_year_avg'].to_numpy(dtype=np.float64, na_value=np.nan)
+
+        cube = cls(cells, cell_ids, salaries, weights)
+        cube.cells = cube._with_measures(np.arange(len(df)))
+        return cube
+
+    @classmethod
+    def from_cells(cls, cells):
+        """Cube over precomputed cells (dimensions plus count, salary_sum and salary_count).
+
+        It answers queries like any cube but has no per-posting cell ids, so
+        it cannot be subset by rows.
+        """
+        return cls(cells, None, None)
+
+    def _with_measures(self, rows):
+        cell_ids = self.cell_ids[rows]
+        salaries = self.salaries[rows]
+        weights = None if self.weights is None else self.weights[rows]
+        has_salary = ~np.isnan(salaries)
+        salary_weights = None if weights is None else weights[has_salary]
+        salary_sums = salaries[has_salary] if weights is None else salaries[has_salary] * salary_weights
+        n_cells = len(self.cells)
+
+        cells = self.cells[CUBE_DIMENSIONS].copy()
+        cells['count'] = np.bincount(cell_ids, weights=weights, minlength=n_cells)
+        cells['salary_sum'] = np.bincount(cell_ids[has_salary], weights=salary_sums, minlength=n_cells)
+        cells['salary_count'] = np.bincount(cell_ids[has_salary], weights=salary_weights, minlength=n_cells)
+        return cells
+
+    def subset(self, rows):
+        """Cube restricted to the postings at the given row positions."""
+        if self.cell_ids is None:
+            raise ValueError('this cube was built from aggregated cells and cannot be subset by rows')
+        cube = copy.copy(self)
+        cells = self._with_measures(rows)
+        cube.cells = cells[cells['count'] > 0].reset_index(drop=True)
+        return cube
+
+    def query(self, by, **filters):
+        """Counts and mean salary grouped by one or more dimensions, after equality filters on others."""
+        cells = self.cells
+        for dimension, value in filters.items():
+            cells = cells[cells[dimension] == value]
+
+        result = cells.groupby(by, observed=True)[['count', 'salary_sum', 'salary_count']].sum()
+        result['salary_mean'] = result['salary_sum'] / result['salary_count'].where(result['salary_count'] > 0)
+        return result
+
+    def counts(self, by, **filters):
+        """Posting counts per value of a dimension, largest first."""
+        counts = self.query(by, **filters)['count']
+        return counts[counts > 0].sort_values(ascending=False, kind='stable')
+
+    def salary_mean(self, **filters):
+        cells = self.cells
+        for dimension, value in filters.items():
+            cells = cells[cells[dimension] == value]
+        salary_count = cells['salary_count'].sum()
+        return cells['salary_sum'].sum() / salary_count if salary_count else np.nan
+
+    def shares(self, by, **filters):
+        """Percentage of postings per value of a dimension."""
+        counts = self.counts(by, **filters)
+        return counts / counts.sum() * 100
+
+
+def company_stats(df):
+    """Postings per company with each company's dominant country, largest companies first.
+
+    Built from one (company, country) pair count table, so finding the
+    dominant country needs no per-company Python call. Ties go to the
+    alphabetically first country, as with Series.mode.
+    """
+    pairs = df.groupby(['company_name', 'job_country'], observed=True).size().rename('count').reset_index()
+    totals = pairs.groupby('company_name', observed=True)['count'].sum()
+    dominant = pairs.sort_values(['count', 'job_country'], ascending=[False, True]).drop_duplicates('company_name')
+
+    stats = dominant.set_index('company_name')[['job_country']]
+    stats.insert(0, 'count', totals)
+    return stats.sort_values('count', ascending=False, kind='stable')
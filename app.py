@@ -1,26 +1,23 @@
+# Plotting, mapping and modelling libraries are imported inside the pages that use them, so a
+# cold start only pays for what the first page needs (python startup_report.py shows the breakdown)
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-from plotly.subplots import make_subplots
-import plotly.graph_objs as go
-from wordcloud import WordCloud
-import folium
-from scipy import stats
-from folium.plugins import HeatMap
-from streamlit_folium import folium_static
-import plotly.express as px
-import plotly.graph_objs as go
-from collections import Counter
 from datetime import datetime, timedelta
 import os
-import pickle
-from prophet import Prophet
-import gdown
-
-
+from data_store import APP_SCHEMA, ensure_snapshot, file_fingerprint, freeze, load_dataset, load_sample
+from skills import SkillCooccurrence, SkillIndex, skill_list_counts, skill_title_counts
+from aggregates import JobCube, company_stats
+from forecasts import cached_forecast_table, country_forecast, country_shares, slice_forecast
+from model_registry import ModelRegistry
+from wordclouds import wordcloud_png
+from render_cache import FigureCache
+from progressive import ProgressiveCube
+from geo import bin_locations, heat_map, heat_points
+from metrics import METRICS, counted_cache
+
+
+# import gdown
 # file_id = '1WT2Mn3L0dktnU0pWvJ4NkTwRt0VImM9f'
 
 
@@ -34,29 +31,166 @@ import gdown
 
 # Load data
 
-dataset_path = 'sampled_dataset.csv'
-@st.cache_data
-def load_data():
-    
-    df_cleaned = pd.read_csv(dataset_path)
-    df_cleaned['job_posted_date'] = pd.to_datetime(df_cleaned['job_posted_date'])
-    df_cleaned['date_only'] = df_cleaned['job_posted_date'].dt.date
-    return df_cleaned
-
-def process_skills(skills_string):
-    skills_string = skills_string.replace('[', '').replace(']', '').replace('\'', '').replace(',', '')
-    skills_list = skills_string.split()
-    skills_list = ['power bi' if skill.lower() in ['power', 'bi'] else skill.lower() for skill in skills_list]
-    skills_list = [skill for skill in skills_list if skill not in ['not', 'specified']]
-    return skills_list
+# DATA_JOBS_DATASET points the app at another export, e.g. the full df_cleaned or a posting store
+# directory kept up to date by posting_store.py append; pair it
+# with DATA_JOBS_PROGRESSIVE=1 to answer from a stratified sample while the exact cube builds
+dataset_path = os.environ.get('DATA_JOBS_DATASET', 'sampled_dataset.csv')
+# The sample is drawn with the Parquet snapshot, which a posting store directory does not have
+store_dataset = os.path.isdir(dataset_path)
+progressive = os.environ.get('DATA_JOBS_PROGRESSIVE') == '1' and not store_dataset
+# DATA_JOBS_BACKEND=duckdb runs the Upcoming Possibilities pages as DuckDB queries over the
+# Parquet snapshot instead of holding the dataset in memory
+query_backend = os.environ.get('DATA_JOBS_BACKEND', 'pandas')
+def read_data():
+    # Reads only the columns the pages use from the typed Parquet snapshot, in compact dtypes
+    # (python data_store.py --memory reports the footprint); DATA_JOBS_REBUILD=1 rebuilds it from the CSV.
+    # One read-only frame is shared by every session and rerun instead of being copied out of the cache.
+    return freeze(load_dataset(dataset_path, rebuild=os.environ.get('DATA_JOBS_REBUILD') == '1', schema=APP_SCHEMA))
+
+@counted_cache(st.cache_resource, max_entries=1)
+def load_data(version):
+    if progressive:
+        # The progressive cube reads the frame in the background; wait for that same copy
+        return load_cube(version, None).frame()
+    return read_data()
+
+def dataset_version():
+    return file_fingerprint(dataset_path)
+
+def page_frame(df_cleaned):
+    # Pages get df_cleaned=None when they start without the full frame (progressive mode, or the
+    # duckdb backend); loaders that need row-level data read it here, on first use
+    return load_data(dataset_version()) if df_cleaned is None else df_cleaned
+
+@counted_cache(st.cache_resource)
+def load_skill_index(version, _df_cleaned):
+    # Built once per dataset version; row positions refer to the frame returned by load_data
+    return SkillIndex.build(page_frame(_df_cleaned)['job_skills'])
+
+@counted_cache(st.cache_data)
+def load_skill_counts(version, _df_cleaned):
+    # Postings per skill, most common first, counted once per dataset version on either backend
+    if query_backend == 'duckdb':
+        return load_sql_store(version).skill_counts()
+    return load_skill_index(version, _df_cleaned).skill_counts()
+
+@counted_cache(st.cache_resource)
+def load_cube(version, _df_cleaned):
+    # Every dashboard aggregate is answered from the cube cells instead of the raw postings
+    if progressive:
+        # Starts from the sample drawn with the snapshot, before the full frame is read
+        return ProgressiveCube(load_sample(dataset_path, APP_SCHEMA), read_data)
+    return JobCube.build(page_frame(_df_cleaned))
+
+@counted_cache(st.cache_resource)
+def load_summary_cube(version, _df_cleaned):
+    # Pages that only query aggregates: a posting store answers them from the cells it keeps up to
+    # date on append, so a refresh does not mean reading and regrouping every posting
+    if store_dataset:
+        from posting_store import PostingStore
+        return JobCube.from_cells(PostingStore(dataset_path).cells())
+    return load_cube(version, _df_cleaned)
+
+@counted_cache(st.cache_resource)
+def load_sql_store(version):
+    # duckdb is only needed for this backend
+    from sql_store import SqlStore
+    return SqlStore(ensure_snapshot(dataset_path))
+
+def load_page_cube(df_cleaned):
+    # Cube queries for the Upcoming Possibilities pages: the in-memory cube or the SQL store
+    if query_backend == 'duckdb':
+        return load_sql_store(dataset_version())
+    return load_summary_cube(dataset_version(), df_cleaned)
+
+def load_page_queries(df_cleaned):
+    # (cube, skill lookups) for a page: the in-memory cube and skill index, or one SQL store for both
+    if query_backend == 'duckdb':
+        store = load_sql_store(dataset_version())
+        return store, store
+    return load_cube(dataset_version(), df_cleaned), load_skill_index(dataset_version(), df_cleaned)
+
+def cube_version(cube):
+    # Results drawn from the sample estimate are cached apart from the exact ones
+    return dataset_version() if cube.is_exact else dataset_version() + '-estimate'
+
+def show_refinement_status(cube):
+    # Reruns the page once the background build has replaced the estimate with exact counts
+    if cube.is_exact:
+        return
+
+    @st.fragment(run_every=2)
+    def refinement_status():
+        if cube.is_exact:
+            st.rerun()
+        st.caption(f"⏳ Approximate figures from a {cube.sample_rows:,}-posting stratified sample; "
+                   "exact numbers will replace them shortly.")
+
+    refinement_status()
+
+# Derived tables are shared read-only like the dataset itself
+@counted_cache(st.cache_resource)
+def load_company_stats(version, _df_cleaned):
+    return freeze(company_stats(page_frame(_df_cleaned)))
+
+@st.cache_resource
+def load_figure_cache():
+    # Shared by all sessions; keys include the dataset version so stale figures are never served
+    return FigureCache()
+
+@counted_cache(st.cache_data)
+def load_wordcloud(subject, version, width, height, _df_cleaned):
+    # Rendered from precomputed frequency tables and cached per dataset version and size
+    if subject == "Skills":
+        frequencies = load_skill_counts(dataset_version(), _df_cleaned).head(200)
+    elif subject == "Companies":
+        frequencies = load_company_stats(dataset_version(), _df_cleaned)['count'].drop('Not specified', errors='ignore').head(200)
+    else:
+        frequencies = load_summary_cube(dataset_version(), _df_cleaned).counts('job_title_short')
+    return wordcloud_png(frequencies, width=width, height=height)
+
+@counted_cache(st.cache_resource)
+def load_country_shares(version, _df_cleaned):
+    return freeze(country_shares(load_page_cube(_df_cleaned)))
+
+@counted_cache(st.cache_resource)
+def load_location_bins(version, _df_cleaned):
+    # Postings per 1-degree grid cell and job title; the map only ever sees these cells
+    return freeze(bin_locations(page_frame(_df_cleaned)))
+
+@counted_cache(st.cache_data)
+def load_heat_points(job_title, version, _df_cleaned):
+    return heat_points(load_location_bins(version, _df_cleaned), job_title)
+
+@counted_cache(st.cache_resource)
+def load_skill_title_counts(version, _df_cleaned):
+    if store_dataset:
+        # A posting store keeps this table up to date as batches are appended
+        from posting_store import PostingStore
+        return freeze(PostingStore(dataset_path).skill_title_counts())
+    return freeze(skill_title_counts(load_skill_index(version, _df_cleaned), page_frame(_df_cleaned)['job_title_short']))
+
+@counted_cache(st.cache_resource)
+def load_skill_cooccurrence(version, _df_cleaned):
+    # Built from the distinct (skill list, title) pairs, weighted by their posting counts
+    if query_backend == 'duckdb':
+        lists = load_sql_store(version).skill_list_counts()
+    else:
+        lists = skill_list_counts(page_frame(_df_cleaned))
+    return SkillCooccurrence.build(lists['job_skills'], lists['job_title_short'], lists['count'].to_numpy())
 
 def recent_job_market(df_cleaned, eda_option):
+    import plotly.express as px
+
     st.title("🌟 Recent Data Job Market")
+    cube = load_summary_cube(dataset_version(), df_cleaned)
+    figure_cache = load_figure_cache()
+    show_refinement_status(cube)
 
     if eda_option == "📊 Data Jobs Posting":
         st.subheader("Job Posting In Different Data Fields")
         
-        job_title_counts = df_cleaned['job_title_short'].value_counts().head(10)
+        job_title_counts = cube.counts('job_title_short').head(10)
         fig = px.bar(x=job_title_counts.index, y=job_title_counts.values, 
                      labels={'x': 'Job Title', 'y': 'Number of Jobs'}, 
                      title='Data Job Types by Number of Jobs',
@@ -65,82 +199,83 @@ def recent_job_market(df_cleaned, eda_option):
         fig.update_layout(coloraxis_showscale=False, plot_bgcolor='rgba(0,0,0,0)')
         st.plotly_chart(fig, use_container_width=True)
 
-        text = ' '.join(df_cleaned['job_title_short'].dropna())
-        wordcloud = WordCloud(width=800, height=400, background_color='white').generate(text)
-        fig, ax = plt.subplots(figsize=(10, 5))
-        ax.imshow(wordcloud, interpolation='bilinear')
-        ax.axis('off')
-        st.pyplot(fig)
+        wordcloud_subject = st.radio("☁️ Word cloud of:", ["Job Titles", "Skills", "Companies"], horizontal=True)
+        st.image(load_wordcloud(wordcloud_subject, cube_version(cube), 800, 400, df_cleaned), use_column_width=True)
 
     elif eda_option == "📈 Job Trends":
         st.subheader("Job Trends Analysis")
         
-        job_title_colors = {
-            'Data Engineer': 'blue',
-            'Data Analyst': 'green',
-            'Data Scientist': 'red',
-            'Machine Learning Engineer': 'purple',
-            'Cloud Engineer': 'orange',
-            'Business Analyst': 'pink',
-            'Software Engineer': 'cyan'
-        }
-
-        fig, axes = plt.subplots(nrows=len(job_title_colors), ncols=1, sharex=True, figsize=(14, 24))
-        axes = axes.flatten()
-
-        for i, (job_title, color) in enumerate(job_title_colors.items()):
-            filtered_df = df_cleaned[df_cleaned['job_title_short'] == job_title]
-            jobs_per_day = filtered_df.groupby(filtered_df['job_posted_date'].dt.date).size()
+        def render_job_trends():
+            import matplotlib.pyplot as plt
+            from scipy import stats
+
+            job_title_colors = {
+                'Data Engineer': 'blue',
+                'Data Analyst': 'green',
+                'Data Scientist': 'red',
+                'Machine Learning Engineer': 'purple',
+                'Cloud Engineer': 'orange',
+                'Business Analyst': 'pink',
+                'Software Engineer': 'cyan'
+            }
+
+            fig, axes = plt.subplots(nrows=len(job_title_colors), ncols=1, sharex=True, figsize=(14, 24))
+            axes = axes.flatten()
+
+            daily_counts = cube.query(['date_only', 'job_title_short'])['count'].unstack(fill_value=0)
+
+            for i, (job_title, color) in enumerate(job_title_colors.items()):
+                jobs_per_day = daily_counts.get(job_title, pd.Series(dtype='int64'))
+                jobs_per_day = jobs_per_day[jobs_per_day > 0]
             
-            axes[i].plot(jobs_per_day.index, jobs_per_day.values, 
-                         linestyle='-', color=color, label=f'{job_title} (Original)')
+                axes[i].plot(jobs_per_day.index, jobs_per_day.values, 
+                             linestyle='-', color=color, label=f'{job_title} (Original)')
             
-            x_values = np.arange(len(jobs_per_day))
-            y_values = jobs_per_day.values
-            slope, intercept, r_value, p_value, std_err = stats.linregress(x_values, y_values)
-            trend_line = slope * x_values + intercept
+                x_values = np.arange(len(jobs_per_day))
+                y_values = jobs_per_day.values
+                slope, intercept, r_value, p_value, std_err = stats.linregress(x_values, y_values)
+                trend_line = slope * x_values + intercept
             
-            axes[i].plot(jobs_per_day.index, trend_line, 
-                         linestyle='--', color='black', label=f'{job_title} (Trend)')
+                axes[i].plot(jobs_per_day.index, trend_line, 
+                             linestyle='--', color='black', label=f'{job_title} (Trend)')
             
-            axes[i].set_title(job_title)
-            axes[i].set_ylabel('Number of Jobs')
-            axes[i].legend()
+                axes[i].set_title(job_title)
+                axes[i].set_ylabel('Number of Jobs')
+                axes[i].legend()
+
+            plt.xlabel('Date')
+            plt.tight_layout()
+            return fig
 
-        plt.xlabel('Date')
-        plt.tight_layout()
-        st.pyplot(fig)
+        with METRICS.stage('render'):
+            png = figure_cache.matplotlib(('job_trends', (), cube_version(cube)), render_job_trends)
+        st.image(png, use_column_width=True)
 
     elif eda_option == "🗺️ Job Locations":
         st.subheader("Job Locations Analysis")
-        
-        st.image("data_job_animation.gif", use_column_width=True)
+
+        if {'latitude', 'longitude'} <= set(page_frame(df_cleaned).columns):
+            from streamlit_folium import folium_static
+
+            job_titles = ["All"] + cube.counts('job_title_short').index.tolist()
+            location_title = st.selectbox("Job title", job_titles, key="location_title")
+            points = load_heat_points(None if location_title == "All" else location_title, dataset_version(), df_cleaned)
+            st.caption(f"{len(points):,} weighted grid cells")
+            folium_static(heat_map(points), width=900)
+        else:
+            st.image("data_job_animation.gif", use_column_width=True)
 
     elif eda_option == "🛠️ Top Skills":
         st.subheader("Skills Analysis")
-    
-    # Step 1: Expand skills and associate with job titles
-        skills_expanded = []
-        for _, row in df_cleaned.dropna(subset=['job_skills']).iterrows():
-            job_title = row['job_title_short']
-            skills = row['job_skills'].replace('[', '').replace(']', '').replace('\'', '').replace(',', '').split()
-            skills = [skill.lower() for skill in skills]
-            skills = ['power bi' if skill in ['power', 'bi'] else skill for skill in skills]
-            skills = [skill for skill in skills if skill not in ['not', 'specified']]
-            for skill in skills:
-                skills_expanded.append((skill, job_title))
-
-    # Step 2: Convert to DataFrame
-        skills_df = pd.DataFrame(skills_expanded, columns=['Skill', 'job_title_short'])
-
-    # Step 3: Count frequencies of each skill per job title
-        skills_counts = skills_df.groupby(['Skill', 'job_title_short']).size().unstack(fill_value=0)
-
-    # Step 4: Sort by total counts and take top 20 skills
+
+    # Step 1: Skill x job title counts, computed once per dataset version
+        skills_counts = load_skill_title_counts(dataset_version(), df_cleaned)
+
+    # Step 2: Sort by total counts and take top 10 skills
         top_skills_counts = skills_counts.sum(axis=1).sort_values(ascending=False).head(10)
         top_skills_df = skills_counts.loc[top_skills_counts.index]
 
-    # Step 5: Define custom legend order
+    # Step 3: Define custom legend order
         custom_order = [
            'Data Engineer',
            'Data Analyst',
@@ -153,76 +288,91 @@ def recent_job_market(df_cleaned, eda_option):
         # Filter custom_order to include only job titles present in the data
         available_job_titles = [title for title in custom_order if title in top_skills_df.columns]
 
-    # Plotting with improvements
-        fig, ax = plt.subplots(figsize=(16, 12))  # Increased figure size for better readability
-    
         if not available_job_titles:
            st.warning("No matching job titles found in the data.")
            return
 
-        # fig, ax = plt.subplots(figsize=(16, 12))  # Increased figure size for better readability
-        top_skills_df[custom_order].plot(kind='barh', stacked=True, ax=ax, cmap='plasma')
+    # Plotting with improvements
+        def render_top_skills():
+            import matplotlib.pyplot as plt
+
+            fig, ax = plt.subplots(figsize=(16, 12))  # Increased figure size for better readability
+            top_skills_df[custom_order].plot(kind='barh', stacked=True, ax=ax, cmap='plasma')
 
-        # Reverse the y-axis to show highest counts at the top
-        ax.invert_yaxis()
+            # Reverse the y-axis to show highest counts at the top
+            ax.invert_yaxis()
 
-        # Improve x-axis labels
-        ax.set_xlabel('Count', fontsize=18)
-        ax.tick_params(axis='x', labelsize=16)
+            # Improve x-axis labels
+            ax.set_xlabel('Count', fontsize=18)
+            ax.tick_params(axis='x', labelsize=16)
 
-        # Improve y-axis labels
-        ax.set_ylabel('Skill', fontsize=18)
-        ax.tick_params(axis='y', labelsize=18)
+            # Improve y-axis labels
+            ax.set_ylabel('Skill', fontsize=18)
+            ax.tick_params(axis='y', labelsize=18)
 
-        # Add title with improved font size
-        ax.set_title('Top 10 Job Skills by Job Title', fontsize=18, fontweight='bold')
+            # Add title with improved font size
+            ax.set_title('Top 10 Job Skills by Job Title', fontsize=18, fontweight='bold')
 
-        # Improve legend
-        ax.legend(title='Job Title', title_fontsize=18, fontsize=16, bbox_to_anchor=(1.05, 1), loc='upper left')
+            # Improve legend
+            ax.legend(title='Job Title', title_fontsize=18, fontsize=16, bbox_to_anchor=(1.05, 1), loc='upper left')
 
-        # Add value labels to the end of each bar
-        for i, skill in enumerate(top_skills_df.index):
-            total = top_skills_df.loc[skill].sum()
-            ax.text(total, i, f' {total}', va='center', ha='left', fontsize=10)
+            # Add value labels to the end of each bar
+            for i, skill in enumerate(top_skills_df.index):
+                total = top_skills_df.loc[skill].sum()
+                ax.text(total, i, f' {total}', va='center', ha='left', fontsize=10)
 
-        # Adjust layout to prevent cutting off labels
-        plt.tight_layout()
+            # Adjust layout to prevent cutting off labels
+            plt.tight_layout()
+            return fig
 
         # Display the plot in Streamlit
-        st.pyplot(fig)
+        with METRICS.stage('render'):
+            png = figure_cache.matplotlib(('top_skills', (10,), dataset_version()), render_top_skills)
+        st.image(png, use_column_width=True)
 
     elif eda_option == "💼 Top Countries & Companies":
         st.subheader("World's Top Countries and Companies posting Data Jobs")
         
-        company_job_counts = df_cleaned['company_name'].value_counts().head(10)
-        company_countries = df_cleaned.groupby('company_name')['job_country'].agg(lambda x: x.mode()[0])
-        country_job_counts = df_cleaned['job_country'].value_counts().head(10)
+        def render_top_countries_and_companies():
+            import plotly.graph_objs as go
+            from plotly.subplots import make_subplots
 
-        fig = make_subplots(rows=1, cols=2, subplot_titles=('Top 10 Countries by Job Postings', 'Top 10 Companies by Number of Jobs'))
+            top_companies = load_company_stats(dataset_version(), df_cleaned).head(10)
+            company_job_counts = top_companies['count']
+            company_countries = top_companies['job_country']
+            country_job_counts = cube.counts('job_country').head(10)
 
-        fig.add_trace(
-            go.Bar(x=country_job_counts.index, y=country_job_counts.values, 
-                   marker_color=px.colors.sequential.Plasma),
-            row=1, col=1
-        )
+            fig = make_subplots(rows=1, cols=2, subplot_titles=('Top 10 Countries by Job Postings', 'Top 10 Companies by Number of Jobs'))
 
-        fig.add_trace(
-            go.Bar(x=company_job_counts.index, y=company_job_counts.values, 
-                   marker_color=px.colors.sequential.Plasma,
-                   text=[company_countries[company] for company in company_job_counts.index],
-                   textposition='inside'),
-            row=1, col=2
-        )
+            fig.add_trace(
+                go.Bar(x=country_job_counts.index, y=country_job_counts.values, 
+                       marker_color=px.colors.sequential.Plasma),
+                row=1, col=1
+            )
+
+            fig.add_trace(
+                go.Bar(x=company_job_counts.index, y=company_job_counts.values, 
+                       marker_color=px.colors.sequential.Plasma,
+                       text=[company_countries[company] for company in company_job_counts.index],
+                       textposition='inside'),
+                row=1, col=2
+            )
+
+            fig.update_layout(height=600, showlegend=False, title_text="Top Countries and Companies")
+            fig.update_xaxes(tickangle=45)
+            return fig
 
-        fig.update_layout(height=600, showlegend=False, title_text="Top Countries and Companies")
-        fig.update_xaxes(tickangle=45)
+        with METRICS.stage('render'):
+            fig = figure_cache.plotly(('top_countries_and_companies', (10,), cube_version(cube)), render_top_countries_and_companies)
 
         st.plotly_chart(fig, use_container_width=True)
 
     elif eda_option == "💰 Salaries":
         st.subheader("Salary Analysis")
         
-        grouped_df = df_cleaned.groupby('job_title_short').agg({'num_jobs': 'sum', 'salary_year_avg': 'mean'}).reset_index()
+        # Every posting carries num_jobs == 1, so the cube count is the num_jobs total
+        grouped_df = cube.query('job_title_short').rename(columns={'count': 'num_jobs', 'salary_mean': 'salary_year_avg'})
+        grouped_df = grouped_df[grouped_df['num_jobs'] > 0].reset_index()
         
         fig = px.scatter(grouped_df, x='salary_year_avg', y='num_jobs', size='num_jobs', color='job_title_short',
                          hover_name='job_title_short', size_max=60,
@@ -232,9 +382,13 @@ def recent_job_market(df_cleaned, eda_option):
         st.plotly_chart(fig, use_container_width=True)
 
 def future_job_trends(df_cleaned):
+    import plotly.express as px
+
     st.title("🔮 Future Job Trends")
+    cube = load_page_cube(df_cleaned)
+    show_refinement_status(cube)
 
-    job_types = sorted(df_cleaned['job_title_short'].unique())
+    job_types = sorted(cube.counts('job_title_short').index)
     cols = st.columns(4)
     selected_job_type = None
     for i, job_type in enumerate(job_types):
@@ -252,7 +406,10 @@ def future_job_trends(df_cleaned):
             st.warning(f"No forecast plot available for {selected_job_type}")
 
         # Top 10 countries with highest job postings
-        top_countries = df_cleaned[df_cleaned['job_title_short'] == selected_job_type]['job_country'].value_counts().head(10)
+        with METRICS.stage('aggregate'):
+            top_countries = cube.counts('job_country', job_title_short=selected_job_type).head(10)
+            avg_salary = cube.salary_mean(job_title_short=selected_job_type)
+            top_portals = cube.counts('job_via', job_title_short=selected_job_type).head(3)
         
         fig = px.bar(x=top_countries.index, y=top_countries.values,
                      labels={'x': 'Country', 'y': 'Number of Jobs'},
@@ -271,10 +428,6 @@ def future_job_trends(df_cleaned):
         st.plotly_chart(fig, use_container_width=True)
 
         # Average salary and top job portals
-        job_data = df_cleaned[df_cleaned['job_title_short'] == selected_job_type]
-        avg_salary = job_data['salary_year_avg'].mean()
-        top_portals = job_data['job_via'].value_counts().head(3)
-
         col1, col2 = st.columns(2)
         with col1:
             st.metric("💰 Average Salary", f"${avg_salary:,.2f}")
@@ -284,24 +437,35 @@ def future_job_trends(df_cleaned):
                 st.markdown(f"- **{portal}**: {count}")
 
 @st.cache_resource
+def load_model_registry():
+    registry = ModelRegistry()
+    # Load every model in the background at server start; DATA_JOBS_WARM_MODELS=0 keeps loading lazy
+    if os.environ.get('DATA_JOBS_WARM_MODELS', '1') == '1':
+        registry.warm_up()
+    return registry
+
 def load_model(job_type):
-    model_path = f'model_files/{job_type}_job_prediction_model.pkl'
-    if os.path.exists(model_path):
-        with open(model_path, 'rb') as file:
-            model = pickle.load(file)
-        return model
-    return None
+    with METRICS.stage('load_model'):
+        return load_model_registry().get(job_type)
+
+@counted_cache(st.cache_resource)
+def load_forecast(job_type, model_version):
+    # Full-horizon forecast, recomputed only when the model file changes
+    table = cached_forecast_table(job_type, model_version, lambda: load_model(job_type))
+    return None if table is None else freeze(table)
 
 def preparing_for_opportunities(df_cleaned):
+    import plotly.express as px
+
     st.title("🚀 Preparing for Tomorrow's Opportunities")
 
-    all_skills = ' '.join(df_cleaned['job_skills'].dropna())
-    processed_skills = process_skills(all_skills)
-    skill_counts = Counter(processed_skills)
-    top_skills = [skill for skill, _ in skill_counts.most_common(50)]
+    cube, skill_index = load_page_queries(df_cleaned)
+    show_refinement_status(cube)
+    top_skills = load_skill_counts(dataset_version(), df_cleaned).head(50).index.tolist()
     selected_skills = st.multiselect("🛠️ Select skills:", top_skills)
+    skill_match = st.radio("🔗 Jobs requiring:", ["Any selected skill", "All selected skills"], horizontal=True)
 
-    locations = ["All"] + sorted(df_cleaned['job_country'].unique().tolist())
+    locations = ["All"] + sorted(cube.counts('job_country').index.tolist())
     selected_location = st.selectbox("🌍 Select location:", locations)
 
     col1, col2 = st.columns(2)
@@ -323,15 +487,21 @@ def preparing_for_opportunities(df_cleaned):
     elif start_date > end_date:
         st.error("⚠️ End date must be after start date.")
     elif selected_skills:
-        df_filtered = df_cleaned[
-            (df_cleaned['job_skills'].apply(lambda x: any(skill in x for skill in selected_skills))) &
-            (df_cleaned['job_country'] == selected_location if selected_location != "All" else True)
-        ]
-        
-        job_types = df_filtered['job_title_short'].value_counts()
+        match = 'all' if skill_match == "All selected skills" else 'any'
+        with METRICS.stage('filter'):
+            skill_cube = cube.subset(skill_index.lookup(selected_skills, match))
+        location_filter = {} if selected_location == "All" else {'job_country': selected_location}
+
+        with METRICS.stage('aggregate'):
+            job_types = skill_cube.counts('job_title_short', **location_filter)
         job_types_proportion = job_types / job_types.sum()
+        # While the cube is a sample estimate, show its 95% confidence interval as error bars
+        proportion_error = None
+        if not skill_cube.is_exact:
+            bounds = skill_cube.intervals('job_title_short', **location_filter).reindex(job_types.index)
+            proportion_error = ((bounds['upper'] - bounds['count']) / job_types.sum()).values
 
-        fig = px.bar(x=job_types_proportion.index, y=job_types_proportion.values,
+        fig = px.bar(x=job_types_proportion.index, y=job_types_proportion.values, error_y=proportion_error,
                      labels={'x': 'Job Title', 'y': 'Skill relevance proportion in Data job roles'},
                      title='Relevant Job Types',
                      color=job_types_proportion.values,
@@ -353,41 +523,31 @@ def preparing_for_opportunities(df_cleaned):
         selected_job = st.selectbox("🔍 Select a job type for details:", job_types.index.tolist())
         
         if selected_job:
-            job_data = df_filtered[df_filtered['job_title_short'] == selected_job]
-            
-            # Load and use the prediction model
-            model = load_model(selected_job)
-            if model:
-                future_dates = pd.date_range(start=start_date, end=end_date)
-                future = pd.DataFrame({'ds': future_dates})
-                
-                # Make prediction
-                forecast = model.predict(future)
-                
-                # Adjust prediction based on selected location
-                if selected_location != "All":
-                    # Calculate the proportion of jobs in the selected country
-                    country_proportion = len(df_cleaned[(df_cleaned['job_title_short'] == selected_job) & 
-                                                        (df_cleaned['job_country'] == selected_location)]) / \
-                                         len(df_cleaned[df_cleaned['job_title_short'] == selected_job])
-                    
-                    # Adjust the forecast
-                    forecast['yhat'] *= country_proportion
-                    forecast['yhat_lower'] *= country_proportion
-                    forecast['yhat_upper'] *= country_proportion
-                
+            # Slice the precomputed forecast for the selected dates
+            with METRICS.stage('predict'):
+                forecast = None
+                model_version = load_model_registry().version(selected_job)
+                forecast_table = load_forecast(selected_job, model_version) if model_version else None
+                if forecast_table is not None:
+                    forecast = slice_forecast(forecast_table, start_date, end_date)
+
+                    # Adjust prediction based on selected location
+                    if selected_location != "All":
+                        shares = load_country_shares(cube_version(cube), df_cleaned)
+                        forecast = country_forecast(forecast, shares, selected_job, selected_location)
+
+            if forecast is not None:
                 # Calculate total predicted jobs
                 total_jobs = int(forecast['yhat'].sum())
                 
                 # Calculate average salary based on selected location
+                avg_salary = skill_cube.salary_mean(job_title_short=selected_job, **location_filter)
                 if selected_location == "All":
-                    avg_salary = job_data['salary_year_avg'].mean()
                     salary_label = "Global Average Salary"
                 else:
-                    avg_salary = job_data[job_data['job_country'] == selected_location]['salary_year_avg'].mean()
                     salary_label = f"Average Salary in {selected_location}"
                 
-                top_providers = job_data['job_via'].value_counts().nlargest(3).index.tolist()
+                top_providers = skill_cube.counts('job_via', job_title_short=selected_job, **location_filter).head(3).index.tolist()
 
                 st.markdown(f"### 💼 {selected_job}")
                 col1, col2, col3 = st.columns(3)
@@ -418,8 +578,39 @@ def preparing_for_opportunities(df_cleaned):
         
         st.markdown("---")
 
+        # Skills most often listed together with the selection, from the cached co-occurrence matrix
+        st.subheader("🧩 Skills Often Required Alongside Your Selection")
+        related_scope = st.radio("Among postings for:", ([selected_job] if selected_job else []) + ["All data jobs"],
+                                 horizontal=True)
+        with METRICS.stage('aggregate'):
+            cooccurrence = load_skill_cooccurrence(dataset_version(), df_cleaned)
+            related = cooccurrence.related(selected_skills, None if related_scope == "All data jobs" else related_scope)
+        if related.empty:
+            st.info("No skills are listed alongside this selection often enough to score.")
+        else:
+            fig_related = px.bar(related.iloc[::-1], x='lift', y=related.index[::-1], orientation='h',
+                                 text=[f'{v:.0%} of postings' for v in related['share'].iloc[::-1]],
+                                 hover_data={'pmi': ':.2f', 'together': ':,'},
+                                 labels={'lift': 'Lift (times more often than by chance)', 'y': 'Skill'},
+                                 title="Skills That Go With Your Selection")
+            fig_related.update_traces(textposition='outside', marker_color='#96CEB4')
+            fig_related.update_layout(
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                font=dict(size=14, color='#FFFFFF'),
+                title=dict(font=dict(size=24, color='#FF6B6B')),
+                xaxis=dict(title=dict(font=dict(size=18, color='#4ECDC4'))),
+                yaxis=dict(title=dict(text='Skill', font=dict(size=18, color='#4ECDC4')))
+            )
+            st.plotly_chart(fig_related, use_container_width=True)
+            st.caption("Lift compares how often a skill is listed together with your selection to how often it "
+                       "would be if the two were unrelated; the labels give the share of postings listing a selected "
+                       "skill that also list it.")
+
+        st.markdown("---")
+
         # Work from home percentage
-        wfh_counts = df_filtered['job_work_from_home'].value_counts(normalize=True) * 100
+        wfh_counts = skill_cube.shares('job_work_from_home', **location_filter).reindex([False, True], fill_value=0)
         st.subheader("🏠 Work Environment: Remote or Onsite?")
         fig_wfh = px.bar(x=['On-site', 'Remote'], y=wfh_counts.values, 
                          text=[f'{v:.1f}%' for v in wfh_counts.values],
@@ -436,7 +627,7 @@ def preparing_for_opportunities(df_cleaned):
         st.plotly_chart(fig_wfh, use_container_width=True)
 
         # Job schedule type percentage
-        schedule_counts = df_filtered['job_schedule_type'].value_counts(normalize=True) * 100
+        schedule_counts = skill_cube.shares('job_schedule_type', **location_filter)
         st.subheader("⏰  Possible Job Schedule")
         fig_schedule = px.bar(x=schedule_counts.index, y=schedule_counts.values, 
                               text=[f'{v:.1f}%' for v in schedule_counts.values],
@@ -475,6 +666,42 @@ def about_page():
     This interactive, dynamic app utilizes the processed data and predictive models to provide users with valuable job market insights and forecasts.
     """)
 
+@st.cache_resource
+def start_metrics_endpoint(port):
+    # One /metrics endpoint per server process, on DATA_JOBS_METRICS_PORT when set
+    if port:
+        return METRICS.serve(int(port))
+
+def record_cache_gauges():
+    stats = load_figure_cache().stats()
+    METRICS.set_gauge('figure_cache_bytes', stats['bytes'], 'Bytes held by the rendered figure cache.')
+    METRICS.set_gauge('figure_cache_hit_ratio', round(stats['hit_rate'], 4), 'Share of figure lookups served from the cache.')
+    METRICS.set_gauge('figure_cache_evictions', stats['evictions'], 'Figures evicted from the cache since start.')
+
+def metrics_page():
+    st.title("📈 Metrics")
+    record_cache_gauges()
+
+    st.subheader("Pages")
+    st.caption(f"Latencies over the last {METRICS.window} runs of each page, in milliseconds")
+    st.dataframe(METRICS.latency_table('page').round(1), use_container_width=True)
+
+    st.subheader("Stages")
+    st.dataframe(METRICS.latency_table('stage').round(1), use_container_width=True)
+
+    st.subheader("Caches")
+    st.dataframe(METRICS.cache_table().style.format({'hit_rate': '{:.1%}'}), use_container_width=True)
+    figure_stats = load_figure_cache().stats()
+    st.write(f"Figure cache: {figure_stats['entries']} figures, {figure_stats['bytes'] / 2 ** 20:.1f} MB, "
+             f"hit rate {figure_stats['hit_rate']:.1%}, {figure_stats['evictions']} evictions")
+
+    model_stats = load_model_registry().stats
+    if model_stats:
+        st.subheader("Model loads")
+        st.dataframe(pd.DataFrame.from_dict(model_stats, orient='index').rename_axis('job type'), use_container_width=True)
+
+    st.download_button("Download Prometheus metrics", METRICS.prometheus_text(), file_name="data_jobs.prom")
+
 def main():
     st.set_page_config(layout="wide", page_title="Emerging Data Job Opportunities", page_icon="📊")
     
@@ -573,7 +800,12 @@ def main():
     # Main title
     st.markdown('<p class="main-title">Emerging Data Job Opportunities</p>', unsafe_allow_html=True)
     
-    df_cleaned = load_data()
+    start_metrics_endpoint(os.environ.get('DATA_JOBS_METRICS_PORT'))
+    with METRICS.stage('load_data'):
+        # Progressive mode starts from the sample, with the full frame read in the background, and a
+        # posting store answers aggregates from its cells; either way rows are read when a page needs them
+        df_cleaned = None if query_backend != 'pandas' or progressive or store_dataset else load_data(dataset_version())
+    load_model_registry()
     
     # Add the cropped GIF to the top of the sidebar
     st.sidebar.markdown('<div class="sidebar-image">', unsafe_allow_html=True)
@@ -593,6 +825,9 @@ def main():
     
     # Create custom radio buttons for main pages
     main_pages = ["Recent Data Job Market", "Upcoming Possibilities Of Jobs In Data", "About"]
+    # DATA_JOBS_ADMIN=1 adds the latency and cache metrics page
+    if os.environ.get('DATA_JOBS_ADMIN') == '1':
+        main_pages.append("Metrics")
     
     if 'current_page' not in st.session_state:
         st.session_state.current_page = main_pages[0]
@@ -614,12 +849,14 @@ def main():
             "💰 Salaries",
             "🛠️ Top Skills"
         ], label_visibility="collapsed")
-        recent_job_market(df_cleaned, eda_option)
+        with METRICS.page(f"recent_job_market: {eda_option}"):
+            recent_job_market(df_cleaned, eda_option)
     elif st.session_state.current_page == "Upcoming Possibilities Of Jobs In Data":
         st.sidebar.markdown('<p class="sidebar-suboption">Choose Option:</p>', unsafe_allow_html=True)
         sub_page = st.sidebar.radio("", ["Future Job Trends", "Preparing for Tomorrow's Opportunities"], label_visibility="collapsed")
         if sub_page == "Future Job Trends":
-            future_job_trends(df_cleaned)
+            with METRICS.page("future_job_trends"):
+                future_job_trends(df_cleaned)
         else:
             st.markdown("""
             <div class="prediction-note">
@@ -627,9 +864,18 @@ def main():
                 The predictions are based on AI model and may differ from actual results.
             </div>
             """, unsafe_allow_html=True)
-            preparing_for_opportunities(df_cleaned)
+            with METRICS.page("preparing_for_opportunities"):
+                preparing_for_opportunities(df_cleaned)
+    elif st.session_state.current_page == "Metrics":
+        metrics_page()
     else:  # About page
         about_page()
 
+    # DATA_JOBS_METRICS_FILE names a Prometheus text file refreshed after every run
+    metrics_file = os.environ.get('DATA_JOBS_METRICS_FILE')
+    if metrics_file:
+        record_cache_gauges()
+        METRICS.write_textfile(metrics_file)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
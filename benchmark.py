@@ -0,0 +1,195 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from aggregates import JobCube
+from data_store import APP_SCHEMA, build_snapshot, file_fingerprint, load_dataset, snapshot_path
+from forecasts import forecast_table
+from model_registry import MODEL_DIR, ModelRegistry
+from skills import SkillIndex, skill_title_counts
+from synthetic import synthetic_csv
+
+SCALES = [10_000, 100_000, 1_000_000, 5_000_000]
+DATA_DIR = 'benchmark_data'
+RESULTS_PATH = 'benchmark_results/latest.json'
+BASELINE_PATH = 'benchmark_baseline.json'
+# A benchmark regresses when it is this much slower than the baseline, and by more than MIN_DELTA seconds
+TOLERANCE = 0.25
+MIN_DELTA = 0.005
+BENCHMARK_SKILLS = ['python', 'sql']
+
+
+def measure(fn, repeat):
+    """Run fn repeat times; returns the last result and the wall times."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, times
+
+
+def job_trends(cube):
+    """The Job Trends page's computation without the plotting: daily counts and a linear trend per title."""
+    daily_counts = cube.query(['date_only', 'job_title_short'])['count'].unstack(fill_value=0)
+    trends = {}
+    for job_title in daily_counts.columns:
+        jobs_per_day = daily_counts[job_title]
+        jobs_per_day = jobs_per_day[jobs_per_day > 0]
+        trends[job_title] = stats.linregress(np.arange(len(jobs_per_day)), jobs_per_day.values).slope
+    return trends
+
+
+def top_skills(index, titles):
+    counts = skill_title_counts(index, titles)
+    return counts.loc[counts.sum(axis=1).sort_values(ascending=False).head(10).index]
+
+
+def skill_filter(cube, index):
+    """The preparing_for_opportunities aggregates for one skill selection."""
+    skill_cube = cube.subset(index.lookup(BENCHMARK_SKILLS, 'any'))
+    return (skill_cube.counts('job_title_short'),
+            skill_cube.salary_mean(job_title_short='Data Analyst'),
+            skill_cube.shares('job_work_from_home'),
+            skill_cube.shares('job_schedule_type'))
+
+
+def load_model_and_predict(model_dir=MODEL_DIR):
+    registry = ModelRegistry(model_dir)
+    job_type = registry.job_types()[0]
+    return forecast_table(registry._load(job_type))
+
+
+def dataset_benchmarks(n_rows, data_dir, repeat, eda_targets):
+    """Timings of every dataset-dependent benchmark at one scale."""
+    csv_path = synthetic_csv(n_rows, data_dir)
+    timings = {}
+
+    fingerprint = file_fingerprint(csv_path)
+    _, timings['snapshot_build'] = measure(lambda: build_snapshot(csv_path, fingerprint), 1)
+    df, timings['load_data'] = measure(lambda: load_dataset(csv_path, schema=APP_SCHEMA), repeat)
+    index, timings['skill_index'] = measure(lambda: SkillIndex.build(df['job_skills']), repeat)
+    _, timings['top_skills'] = measure(lambda: top_skills(index, df['job_title_short']), repeat)
+    cube, timings['cube_build'] = measure(lambda: JobCube.build(df), repeat)
+    _, timings['job_trends'] = measure(lambda: job_trends(cube), repeat)
+    _, timings['skill_filter'] = measure(lambda: skill_filter(cube, index), repeat)
+
+    if eda_targets:
+        import eda
+
+        snapshot = snapshot_path(csv_path, fingerprint)
+        with tempfile.TemporaryDirectory() as plot_dir:
+            for target in eda_targets:
+                _, timings[f'eda:{target}'] = measure(lambda: eda.render_target(target, snapshot, plot_dir), repeat)
+    return timings
+
+
+def run(scales=SCALES, repeat=3, data_dir=DATA_DIR, eda_targets=None, model_dir=MODEL_DIR):
+    """Run the suite; returns a JSON-serializable result document."""
+    results = []
+
+    def record(name, rows, times):
+        results.append({
+            'benchmark': name,
+            'rows': rows,
+            'median_seconds': statistics.median(times),
+            'min_seconds': min(times),
+            'repeat': len(times),
+        })
+        rows_label = f'{rows:,}' if rows else '-'
+        print(f'{name:<42} {rows_label:>10} rows  {statistics.median(times) * 1000:10.1f} ms', flush=True)
+
+    if model_dir and os.path.isdir(model_dir):
+        _, times = measure(lambda: load_model_and_predict(model_dir), repeat)
+        record('load_model_predict', None, times)
+
+    for n_rows in scales:
+        for name, times in dataset_benchmarks(n_rows, data_dir, repeat, eda_targets).items():
+            record(name, n_rows, times)
+
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+        },
+        'results': results,
+    }
+
+
+def compare(results, baseline, tolerance=TOLERANCE, min_delta=MIN_DELTA):
+    """Benchmarks whose median is slower than the baseline's by more than the tolerance."""
+    baseline_times = {(r['benchmark'], r['rows']): r['median_seconds'] for r in baseline['results']}
+    regressions = []
+    for result in results['results']:
+        before = baseline_times.get((result['benchmark'], result['rows']))
+        if before is None:
+            continue
+        after = result['median_seconds']
+        if after > before * (1 + tolerance) and after - before > min_delta:
+            regressions.append({**result, 'baseline_seconds': before, 'ratio': after / before})
+    return regressions
+
+
+def write_json(document, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(document, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard's data paths on synthetic data.")
+    parser.add_argument('--scales', type=int, nargs='+', default=SCALES, help='dataset sizes in rows')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--data-dir', default=DATA_DIR, help='where generated datasets are kept between runs')
+    parser.add_argument('--eda', nargs='*', metavar='TARGET',
+                        help='also time these eda.py plot targets (all of them when no names are given)')
+    parser.add_argument('--output', default=RESULTS_PATH)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='allowed slowdown, as a fraction')
+    args = parser.parse_args()
+    # Plotting libraries' deprecation chatter would bury the timings
+    warnings.simplefilter('ignore')
+
+    eda_targets = args.eda
+    if eda_targets is not None:
+        from eda import TARGETS
+        eda_targets = eda_targets or list(TARGETS)
+        unknown = sorted(set(eda_targets) - set(TARGETS))
+        if unknown:
+            parser.error(f"unknown eda targets: {', '.join(unknown)}")
+
+    results = run(args.scales, args.repeat, args.data_dir, eda_targets)
+    write_json(results, args.output)
+    print(f'\nResults written to {args.output}')
+
+    if args.save_baseline:
+        write_json(results, args.baseline)
+        print(f'Baseline saved to {args.baseline}')
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['benchmark']} at {r['rows'] or '-'} rows: "
+                  f"{r['median_seconds'] * 1000:.1f} ms vs {r['baseline_seconds'] * 1000:.1f} ms ({r['ratio']:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f'No regressions against {args.baseline} (tolerance {args.tolerance:.0%})')
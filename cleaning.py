@@ -0,0 +1,340 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from normalize import normalize_column, normalize_schedule_type
+from salary import IMPUTE_KEYS, IQR_MULTIPLIER, OUTLIER_KEYS, QUANTILES, combine_reports, iqr_fences, salary_report
+
+RAW_PATH = 'Data/Raw/data_jobs.csv'
+OUTPUT_PATH = 'Data/output/df_cleaned.parquet'
+
+JOB_TITLE_MAPPING = {
+    'Senior Data Analyst': 'Data Analyst',
+    'Senior Data Scientist': 'Data Scientist',
+    'Senior Data Engineer': 'Data Engineer'
+}
+
+FILL_VALUES = {
+    'job_via': 'Other',
+    'job_location': 'Anywhere',
+    'job_skills': 'Not specified',
+    'company_name': 'Not specified',
+    'job_type_skills': 'Not specified',
+}
+
+DROP_COLUMNS = ['salary_rate', 'salary_hour_avg']
+
+OUTPUT_TYPES = {
+    'job_work_from_home': pa.bool_(),
+    'job_no_degree_mention': pa.bool_(),
+    'job_health_insurance': pa.bool_(),
+    'job_posted_date': pa.timestamp('ns'),
+    'salary_year_avg': pa.float64(),
+    'num_jobs': pa.int64(),
+    'latitude': pa.float64(),
+    'longitude': pa.float64(),
+    'date_only': pa.timestamp('ns'),
+}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB."""
+    try:
+        import resource
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 2 ** 20
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def weighted_quantile(values, weights, q):
+    """Linear-interpolation quantile of values repeated weights times, without materializing the repeats."""
+    order = np.argsort(values, kind='stable')
+    values, weights = values[order], weights[order]
+    ends = np.cumsum(weights)
+    position = (ends[-1] - 1) * q
+    lower, upper = int(np.floor(position)), int(np.ceil(position))
+    value_lower = values[np.searchsorted(ends, lower, side='right')]
+    value_upper = values[np.searchsorted(ends, upper, side='right')]
+    return value_lower + (value_upper - value_lower) * (position - lower)
+
+
+def read_chunks(raw_path, chunksize):
+    return pd.read_csv(raw_path, chunksize=chunksize)
+
+
+def group_values(series, frame, keys):
+    """Value of a series indexed by the given key columns for every row of frame, NaN where it has none."""
+    return series.reindex(pd.MultiIndex.from_arrays([frame[key] for key in keys])).to_numpy(dtype=np.float64)
+
+
+def as_multiindex(series):
+    if not isinstance(series.index, pd.MultiIndex):
+        series.index = pd.MultiIndex.from_arrays([series.index])
+    return series
+
+
+def collect_stats(raw_path, chunksize=100_000, impute_keys=IMPUTE_KEYS, outlier_keys=OUTLIER_KEYS, k=IQR_MULTIPLIER,
+                  quantiles=QUANTILES):
+    """First pass: the group-level statistics every row-level cleaning step depends on.
+
+    Salary sums, counts and missing counts are gathered per combination of
+    every key involved, so each imputation level's means (which include the
+    values filled at earlier levels) are derived from that small table.
+    The fences are exact quantiles (quantiles, IQR multiplier k) of each
+    outlier group's salaries. They are computed from a count per distinct
+    (group, salary) pair, so memory grows with the number of distinct
+    salaries per group, never beyond the number of postings with a salary.
+    """
+    impute_keys = [list(keys) for keys in impute_keys]
+    outlier_keys = list(outlier_keys)
+    group_keys = list(dict.fromkeys([key for keys in impute_keys for key in keys] + outlier_keys + ['job_country']))
+    schedule_counts = pd.Series(dtype='int64')
+    salary_groups = []
+    salary_counts = []
+
+    for chunk in read_chunks(raw_path, chunksize):
+        chunk = chunk.assign(job_title_short=chunk['job_title_short'].replace(JOB_TITLE_MAPPING))
+        schedule_counts = schedule_counts.add(chunk['job_schedule_type'].value_counts(), fill_value=0)
+
+        salary = chunk['salary_year_avg']
+        salary_groups.append(pd.DataFrame({
+            **{key: chunk[key] for key in group_keys},
+            'salary_sum': salary.fillna(0), 'salary_count': salary.notna(), 'missing': salary.isna(),
+        }).groupby(group_keys, dropna=False).sum())
+
+        # Only rows that survive the country filter take part in the outlier fences
+        kept = chunk['job_country'].notna() & salary.notna()
+        salary_counts.append(pd.DataFrame({**{key: chunk.loc[kept, key] for key in outlier_keys},
+                                           'salary': salary[kept]}).value_counts())
+
+    groups = pd.concat(salary_groups).groupby(level=group_keys, dropna=False).sum().reset_index()
+
+    # Each level fills what earlier levels left missing; groups with a missing key get no mean
+    filled = np.zeros(len(groups), dtype=bool)
+    fill_values = np.zeros(len(groups))
+    means = []
+    for keys in impute_keys:
+        level = pd.DataFrame({
+            'salary_sum': groups['salary_sum'] + groups['missing'] * np.where(filled, fill_values, 0),
+            'salary_count': groups['salary_count'] + groups['missing'] * filled,
+        }).groupby([groups[key] for key in keys]).sum()
+        level_means = as_multiindex((level['salary_sum'] / level['salary_count'].where(level['salary_count'] > 0)).dropna())
+        means.append(level_means)
+
+        group_fill = group_values(level_means, groups, keys)
+        newly_filled = ~filled & ~np.isnan(group_fill)
+        fill_values[newly_filled] = group_fill[newly_filled]
+        filled |= newly_filled
+
+    imputed = groups[groups['job_country'].notna() & (groups['missing'] > 0) & filled]
+    imputed_salaries = {
+        group: (fill_values[rows.index], rows['missing'].to_numpy(dtype=np.int64))
+        for group, rows in imputed.groupby(outlier_keys)
+    }
+
+    salary_counts = pd.concat(salary_counts).groupby(level=outlier_keys + ['salary']).sum()
+    observed_salaries = {
+        group: (counts.index.get_level_values('salary').to_numpy(dtype=np.float64), counts.to_numpy(dtype=np.int64))
+        for group, counts in salary_counts.groupby([salary_counts.index.get_level_values(key) for key in outlier_keys])
+    }
+
+    fences = {}
+    empty = (np.zeros(0), np.zeros(0, dtype=np.int64))
+    for group in sorted(set(observed_salaries) | set(imputed_salaries)):
+        observed_values, observed_weights = observed_salaries.get(group, empty)
+        imputed_values, imputed_weights = imputed_salaries.get(group, empty)
+        values = np.concatenate([observed_values, imputed_values])
+        weights = np.concatenate([observed_weights, imputed_weights])
+        q1 = weighted_quantile(values, weights, quantiles[0])
+        q3 = weighted_quantile(values, weights, quantiles[1])
+        fences[group] = iqr_fences(q1, q3, k)
+
+    fences = pd.DataFrame(list(fences.values()), columns=['lower', 'upper'],
+                          index=pd.MultiIndex.from_tuples(list(fences), names=outlier_keys))
+    return {
+        'schedule_mode': schedule_counts.idxmax() if len(schedule_counts) else None,
+        'impute_keys': impute_keys,
+        'means': means,
+        'outlier_keys': outlier_keys,
+        'fences': fences,
+    }
+
+
+def write_stats(stats, path):
+    """Save collect_stats output as JSON, so later batches can be cleaned with the same rules."""
+    document = {
+        'schedule_mode': stats['schedule_mode'],
+        'impute_keys': stats['impute_keys'],
+        'means': [[list(group) + [mean] for group, mean in means.items()] for means in stats['means']],
+        'outlier_keys': stats['outlier_keys'],
+        'fences': [list(group) + [lower, upper] for group, (lower, upper) in stats['fences'].iterrows()],
+    }
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(document, f, default=float)
+    os.replace(tmp_path, path)
+
+
+def read_stats(path):
+    with open(path) as f:
+        document = json.load(f)
+    outlier_keys = document['outlier_keys']
+    fences = document['fences']
+    return {
+        'schedule_mode': document['schedule_mode'],
+        'impute_keys': document['impute_keys'],
+        'means': [
+            pd.Series([row[-1] for row in means], dtype=np.float64,
+                      index=pd.MultiIndex.from_tuples([tuple(row[:-1]) for row in means], names=keys))
+            for keys, means in zip(document['impute_keys'], document['means'])
+        ],
+        'outlier_keys': outlier_keys,
+        'fences': pd.DataFrame([row[-2:] for row in fences], columns=['lower', 'upper'], dtype=np.float64,
+                               index=pd.MultiIndex.from_tuples([tuple(row[:-2]) for row in fences], names=outlier_keys)),
+    }
+
+
+def clean_chunk(chunk, stats, country_coords=None, with_report=False):
+    """Second pass: apply the notebook's cleaning steps to one chunk using the first-pass statistics.
+
+    With with_report, also returns salary.salary_report's per-group counts
+    of imputed and dropped rows for the chunk.
+    """
+    chunk = chunk.copy()
+    chunk['num_jobs'] = 1
+    chunk['job_title_short'] = chunk['job_title_short'].replace(JOB_TITLE_MAPPING)
+
+    if stats['schedule_mode'] is not None:
+        chunk['job_schedule_type'] = chunk['job_schedule_type'].fillna(stats['schedule_mode'])
+    chunk['job_schedule_type'] = normalize_column(chunk['job_schedule_type'], normalize_schedule_type)
+
+    # Fill salaries from each imputation level's means in turn, e.g. (title, country) then title
+    salary = chunk['salary_year_avg']
+    filled_by = pd.Series(-1, index=chunk.index, dtype='int8')
+    for level, (keys, means) in enumerate(zip(stats['impute_keys'], stats['means'])):
+        fill = pd.Series(group_values(means, chunk, keys), index=chunk.index)
+        filled_by[salary.isna() & fill.notna()] = level
+        salary = salary.fillna(fill)
+    chunk['salary_year_avg'] = salary
+
+    chunk = chunk[chunk['job_country'].notna()]
+    chunk = chunk.dropna(how='all', subset=chunk.columns.difference(['job_country']))
+    chunk = chunk.drop(columns=[col for col in DROP_COLUMNS if col in chunk.columns])
+    chunk = chunk.fillna(FILL_VALUES)
+
+    # Remove salary outliers with the per-group IQR fences
+    outlier_keys = stats['outlier_keys']
+    fences = stats['fences'].reindex(pd.MultiIndex.from_arrays([chunk[key] for key in outlier_keys]))
+    lower = pd.Series(fences['lower'].to_numpy(), index=chunk.index)
+    upper = pd.Series(fences['upper'].to_numpy(), index=chunk.index)
+    keep = (chunk['salary_year_avg'] >= lower) & (chunk['salary_year_avg'] <= upper)
+    report = salary_report(chunk, filled_by[chunk.index], keep, lower, upper, outlier_keys, stats['impute_keys']) if with_report else None
+    chunk = chunk[keep]
+
+    chunk['job_posted_date'] = pd.to_datetime(chunk['job_posted_date'], format='ISO8601')
+    if country_coords is not None:
+        coords = country_coords.reindex(chunk['job_country'])
+        chunk['latitude'] = coords['latitude'].to_numpy()
+        chunk['longitude'] = coords['longitude'].to_numpy()
+    chunk = chunk.reset_index(drop=True)
+    return (chunk, report) if with_report else chunk
+
+
+def output_schema(columns):
+    return pa.schema([(col, OUTPUT_TYPES.get(col, pa.string())) for col in columns])
+
+
+def clean(raw_path=RAW_PATH, output_path=OUTPUT_PATH, chunksize=100_000, coords_path=None, csv_path=None,
+          impute_keys=IMPUTE_KEYS, outlier_keys=OUTLIER_KEYS, k=IQR_MULTIPLIER, quantiles=QUANTILES):
+    """Clean the raw postings in two streaming passes and write Parquet (and optionally CSV).
+
+    A per-group salary report (rows, imputed rows per level, dropped rows and
+    the fences) is written next to the output as <output>.salary_report.csv.
+    """
+    start = time.perf_counter()
+    stats = collect_stats(raw_path, chunksize, impute_keys, outlier_keys, k, quantiles)
+    stats_seconds = time.perf_counter() - start
+
+    country_coords = None
+    if coords_path:
+        country_coords = pd.read_csv(coords_path).set_index('job_country')[['latitude', 'longitude']]
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    tmp_output = output_path + '.tmp'
+    writer = None
+    rows_in = rows_out = 0
+    reports = []
+    try:
+        for chunk in read_chunks(raw_path, chunksize):
+            rows_in += len(chunk)
+            cleaned, report = clean_chunk(chunk, stats, country_coords, with_report=True)
+            reports.append(report)
+            rows_out += len(cleaned)
+            if writer is None:
+                schema = output_schema(cleaned.columns)
+                writer = pq.ParquetWriter(tmp_output, schema)
+            writer.write_table(pa.Table.from_pandas(cleaned, schema=schema, preserve_index=False))
+            if csv_path:
+                cleaned.to_csv(csv_path, mode='w' if rows_out == len(cleaned) else 'a',
+                               header=rows_out == len(cleaned), index=False)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_output, output_path)
+
+    report_path = os.path.splitext(output_path)[0] + '.salary_report.csv'
+    salary_table = combine_reports(reports)
+    if salary_table is not None:
+        salary_table.to_csv(report_path + '.tmp')
+        os.replace(report_path + '.tmp', report_path)
+
+    seconds = time.perf_counter() - start
+    return {
+        'rows_in': rows_in,
+        'rows_out': rows_out,
+        'seconds': seconds,
+        'stats_seconds': stats_seconds,
+        'rows_per_second': rows_in / seconds if seconds else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+        'salary_report': report_path if salary_table is not None else None,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Clean the raw job postings into df_cleaned.')
+    parser.add_argument('raw', nargs='?', default=RAW_PATH)
+    parser.add_argument('output', nargs='?', default=OUTPUT_PATH)
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--coords', help='CSV with job_country, latitude and longitude columns')
+    parser.add_argument('--csv', help='also write the cleaned rows to this CSV path')
+    parser.add_argument('--impute-keys', nargs='+', default=[','.join(keys) for keys in IMPUTE_KEYS],
+                        help='groupings whose mean salary fills missing salaries, tried in order, '
+                             'each a comma-separated list of columns')
+    parser.add_argument('--outlier-keys', default=','.join(OUTLIER_KEYS),
+                        help='comma-separated columns grouping the salary outlier fences')
+    parser.add_argument('--iqr-multiplier', type=float, default=IQR_MULTIPLIER,
+                        help='outliers lie more than this many IQRs outside the quantiles')
+    parser.add_argument('--quantiles', type=float, nargs=2, default=QUANTILES, metavar=('LOW', 'HIGH'),
+                        help='quantiles whose range sets the outlier fences (default: the quartiles, 0.25 0.75)')
+    args = parser.parse_args()
+    if not 0 <= args.quantiles[0] < args.quantiles[1] <= 1:
+        parser.error('--quantiles needs 0 <= LOW < HIGH <= 1')
+
+    report = clean(args.raw, args.output, args.chunksize, args.coords, args.csv,
+                   [keys.split(',') for keys in args.impute_keys], args.outlier_keys.split(','), args.iqr_multiplier,
+                   args.quantiles)
+    print(f"{report['rows_in']:,} rows in, {report['rows_out']:,} rows out in {report['seconds']:.1f}s "
+          f"({report['rows_per_second']:,.0f} rows/s, statistics pass {report['stats_seconds']:.1f}s), "
+          f"peak RSS {report['peak_rss_mb']:.0f} MB")
+    if report['salary_report']:
+        print(f"salary report: {report['salary_report']}")
@@ -0,0 +1,266 @@
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from progressive import sample_frame
+
+# Snapshots of the cleaned dataset are written here, one per source fingerprint
+CACHE_DIR = 'cache'
+
+CATEGORICAL_COLUMNS = ['job_title_short', 'job_country', 'job_via', 'job_schedule_type']
+
+# Columns the dashboard reads and the dtype each is held in; the wide text columns are never loaded
+APP_SCHEMA = {
+    'job_title_short': 'category',
+    'job_country': 'category',
+    'job_via': 'category',
+    'job_schedule_type': 'category',
+    'company_name': 'category',
+    'job_skills': 'category',
+    'job_work_from_home': 'bool',
+    'date_only': 'datetime64[ns]',
+    'salary_year_avg': 'float32',
+    'latitude': 'float32',
+    'longitude': 'float32',
+}
+
+
+def file_fingerprint(path):
+    """Content hash of a source file, reusing the stored hash while size and mtime are unchanged.
+
+    A posting store directory (posting_store.py) is identified by its
+    version, which changes with every appended batch.
+    """
+    if os.path.isdir(path):
+        from posting_store import PostingStore
+        return PostingStore(path).version
+
+    stat = os.stat(path)
+    stat_key = f'{stat.st_size}:{stat.st_mtime_ns}'
+    sidecar = os.path.join(CACHE_DIR, source_key(path) + '.fingerprint.json')
+
+    if os.path.exists(sidecar):
+        with open(sidecar) as f:
+            stored = json.load(f)
+        if stored.get('stat_key') == stat_key:
+            return stored['fingerprint']
+
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    fingerprint = digest.hexdigest()[:16]
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(sidecar, 'w') as f:
+        json.dump({'stat_key': stat_key, 'fingerprint': fingerprint}, f)
+    return fingerprint
+
+
+def source_key(path):
+    """Name prefix of a source's cache files: its file stem plus a hash of its resolved path.
+
+    Sources with the same file name in different directories get their own
+    fingerprint sidecar and snapshots.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return f'{stem}-{hashlib.sha1(os.path.realpath(path).encode()).hexdigest()[:8]}'
+
+
+def snapshot_path(path, fingerprint):
+    return os.path.join(CACHE_DIR, f'{source_key(path)}-{fingerprint}.parquet')
+
+
+def sample_path(path, fingerprint):
+    """Where the snapshot's stratified sample (progressive.sample_frame) is kept."""
+    return snapshot_path(path, fingerprint)[:-len('.parquet')] + '.sample.parquet'
+
+
+def write_sample(df, target):
+    tmp_target = target + '.tmp'
+    sample_frame(df).to_parquet(tmp_target, index=False)
+    os.replace(tmp_target, target)
+
+
+def read_source(path):
+    """Parse the cleaned CSV (or Parquet output of cleaning.py) into typed columns."""
+    df = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+    df['job_posted_date'] = pd.to_datetime(df['job_posted_date'], format='ISO8601')
+    df['date_only'] = df['job_posted_date'].dt.normalize()
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def build_snapshot(path, fingerprint, with_sample=False):
+    """Write the source's Parquet snapshot (and with_sample, its stratified sample) and return the frame."""
+    df = read_source(path)
+    target = snapshot_path(path, fingerprint)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    # Write to a temporary file first so a crashed build never leaves a partial snapshot
+    tmp_target = target + '.tmp'
+    df.to_parquet(tmp_target, index=False)
+    os.replace(tmp_target, target)
+    # Only progressive mode reads the sample; drawing it here saves reading the snapshot back
+    sample = sample_path(path, fingerprint)
+    if with_sample:
+        write_sample(df, sample)
+
+    # Snapshots and samples of older versions of the same source are no longer reachable. Names are
+    # <key>-<fingerprint>[.sample].parquet, so another source's key never leaves a dash-free remainder
+    prefix = source_key(path) + '-'
+    for name in os.listdir(CACHE_DIR):
+        old = os.path.join(CACHE_DIR, name)
+        version = name[len(prefix):].split('.')[0]
+        if name.startswith(prefix) and name.endswith('.parquet') and '-' not in version and old not in (target, sample):
+            os.remove(old)
+    return df
+
+
+def ensure_snapshot(path, rebuild=False):
+    """Path of the dataset's Parquet snapshot, building the snapshot if it does not exist yet.
+
+    A posting store is already Parquet; its partition files are returned instead.
+    """
+    if os.path.isdir(path):
+        from posting_store import PostingStore
+        return PostingStore(path).files()
+    fingerprint = file_fingerprint(path)
+    target = snapshot_path(path, fingerprint)
+    if rebuild or not os.path.exists(target):
+        build_snapshot(path, fingerprint)
+    return target
+
+
+def apply_schema(df, schema):
+    """Cast columns to the schema's dtypes; missing flags count as False."""
+    for col, dtype in schema.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        if dtype == 'bool':
+            df[col] = df[col].map({True: True, False: False, 'True': True, 'False': False}).fillna(False).astype(bool)
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def load_dataset(path, rebuild=False, schema=None):
+    """Load the cleaned dataset from its Parquet snapshot, building the snapshot on first use.
+
+    With a schema, only its columns are read from the snapshot (those the
+    dataset lacks are skipped) and each is cast to the schema's dtype.
+    A posting store directory is read from its partitions directly.
+    """
+    if os.path.isdir(path):
+        from posting_store import PostingStore
+        return PostingStore(path).load(schema)
+
+    fingerprint = file_fingerprint(path)
+    target = snapshot_path(path, fingerprint)
+    if rebuild or not os.path.exists(target):
+        df = build_snapshot(path, fingerprint)
+        if schema is None:
+            return df
+        df = df[[col for col in schema if col in df.columns]].copy()
+    elif schema is None:
+        return pd.read_parquet(target)
+    else:
+        available = set(pq.read_schema(target).names)
+        df = pd.read_parquet(target, columns=[col for col in schema if col in available])
+    return apply_schema(df, schema)
+
+
+def load_sample(path, schema=None):
+    """The stratified sample of the dataset's snapshot, with the schema's columns plus the sample columns.
+
+    The sample is drawn on first use: with the snapshot if that has to be
+    built too, otherwise from the existing snapshot.
+    """
+    fingerprint = file_fingerprint(path)
+    target = sample_path(path, fingerprint)
+    if not os.path.exists(target):
+        snapshot = snapshot_path(path, fingerprint)
+        if os.path.exists(snapshot):
+            write_sample(pd.read_parquet(snapshot), target)
+        else:
+            build_snapshot(path, fingerprint, with_sample=True)
+    if schema is None:
+        return pd.read_parquet(target)
+    available = set(pq.read_schema(target).names)
+    columns = [col for col in schema if col in available]
+    sample = pd.read_parquet(target, columns=columns + ['row', 'weight', 'stratum_population', 'stratum_sample'])
+    return apply_schema(sample, schema)
+
+
+class ReadOnlyFrame(pd.DataFrame):
+    """DataFrame that is shared rather than copied, so it must not change.
+
+    Column buffers are read-only numpy arrays, so in-place value writes
+    (.loc, .iloc) raise ValueError. Adding, replacing or removing columns,
+    assigning index or columns, and inplace=True methods (which all end in
+    _update_inplace or _set_axis) raise TypeError. Frames derived from it
+    are ordinary, writable DataFrames.
+    """
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('this DataFrame is shared read-only; work on a copy (df.copy()) instead')
+
+    __setitem__ = __delitem__ = insert = pop = _update_inplace = _set_axis = _read_only
+
+
+def read_only_values(values):
+    values = values.view()
+    values.flags.writeable = False
+    return values
+
+
+def freeze(df):
+    """Read-only view of a frame, sharing its column buffers instead of copying them."""
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            columns[col] = pd.Categorical.from_codes(read_only_values(series.cat.codes.to_numpy()), dtype=series.dtype)
+        elif isinstance(series.dtype, np.dtype):
+            columns[col] = read_only_values(series.to_numpy())
+        else:
+            # Other extension arrays have no single buffer to lock; they are shared as they are
+            columns[col] = series.array
+    return ReadOnlyFrame(columns, index=df.index, columns=df.columns, copy=False)
+
+
+def memory_report(df):
+    """Per-column dtype and deep memory usage, largest first, with a total row."""
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({'dtype': df.dtypes.astype(str), 'mb': usage / 2 ** 20})
+    report['share'] = report['mb'] / report['mb'].sum() * 100
+    report = report.sort_values('mb', ascending=False)
+    report.loc['total'] = ['', report['mb'].sum(), 100.0]
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the Parquet snapshot of a cleaned dataset.')
+    parser.add_argument('path', nargs='?', default='sampled_dataset.csv')
+    parser.add_argument('--rebuild', action='store_true', help='rebuild even if a snapshot exists')
+    parser.add_argument('--memory', action='store_true', help="compare the memory of the full frame and the app's projection")
+    args = parser.parse_args()
+
+    df = load_dataset(args.path, rebuild=args.rebuild)
+    print(f"Snapshot for {args.path}: {snapshot_path(args.path, file_fingerprint(args.path))} ({len(df):,} rows)")
+    if args.memory:
+        print('\nAll columns:')
+        print(memory_report(df).to_string(float_format='{:.2f}'.format))
+        print('\nApp schema:')
+        print(memory_report(load_dataset(args.path, schema=APP_SCHEMA)).to_string(float_format='{:.2f}'.format))
@@ -1,166 +1,275 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
-import os
-import folium
-from wordcloud import WordCloud
 import pandas as pd
 import numpy as np
+import pyarrow.parquet as pq
+from data_store import ensure_snapshot
+from skills import SkillIndex, skill_title_counts
+from wordclouds import wordcloud_image
+from normalize import normalize_column, normalize_job_via
+from aggregates import company_stats
+from geo import bin_locations, heat_map, heat_points
 
-# Load the dataset
-
-
-# Load the DataFrame from the CSV file
-df = pd.read_csv('Data/output/df_cleaned.csv')
+DATA_PATH = 'Data/output/df_cleaned.csv'
+PLOT_DIR = 'eda_plots'
+MANIFEST_PATH = os.path.join(PLOT_DIR, '.manifest.json')
 
 
-# Create a directory to save the plots if it doesn't exist
-if not os.path.exists('eda_plots'):
-    os.makedirs('eda_plots')
-
 # 1. Distribution of Job Titles
-job_title_counts = df['job_title_short'].value_counts()
-plt.figure(figsize=(12, 8))
-sns.barplot(x=job_title_counts.index, y=job_title_counts.values, palette='husl')
-plt.xticks(rotation=90)
-plt.xlabel('Job Title')
-plt.ylabel('Number of Jobs')
-plt.title('Number of Jobs by Title')
-plt.tight_layout()
-plt.savefig('eda_plots/jobs_by_title.png')
-plt.close()
+def plot_jobs_by_title(df, path):
+    job_title_counts = df['job_title_short'].value_counts()
+    plt.figure(figsize=(12, 8))
+    sns.barplot(x=job_title_counts.index, y=job_title_counts.values, palette='husl')
+    plt.xticks(rotation=90)
+    plt.xlabel('Job Title')
+    plt.ylabel('Number of Jobs')
+    plt.title('Number of Jobs by Title')
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
 
 # 2. Job Titles Word Cloud
-text = ' '.join(df['job_title_short'].dropna())
-wordcloud = WordCloud(width=800, height=400, background_color='white').generate(text)
-plt.figure(figsize=(10, 5))
-plt.imshow(wordcloud, interpolation='bilinear')
-plt.axis('off')
-plt.title('Job Titles Word Cloud')
-plt.tight_layout()
-plt.savefig('eda_plots/job_titles_wordcloud.png')
-plt.close()
+def plot_job_titles_wordcloud(df, path):
+    job_title_counts = df['job_title_short'].value_counts()
+    wordcloud = wordcloud_image(job_title_counts.to_dict(), width=800, height=400)
+    plt.figure(figsize=(10, 5))
+    plt.imshow(wordcloud, interpolation='bilinear')
+    plt.axis('off')
+    plt.title('Job Titles Word Cloud')
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
 
 # 3. Job Locations Heatmap
-heat_data = [[row['latitude'], row['longitude']] for index, row in df.iterrows()]
-m = folium.Map(location=[df['latitude'].mean(), df['longitude'].mean()], zoom_start=2)
-folium.plugins.HeatMap(heat_data).add_to(m)
-m.save('eda_plots/job_locations_heatmap.html')
+def plot_job_locations_heatmap(df, path):
+    m = heat_map(heat_points(bin_locations(df, by=None)))
+    m.save(path)
+
 
 # 4. Job Posting Trends by Job Title
-df['job_posted_date'] = pd.to_datetime(df['job_posted_date'])
-job_title_colors = {
-    'Data Engineer': 'blue', 'Data Analyst': 'green', 'Data Scientist': 'red',
-    'Machine Learning Engineer': 'purple', 'Cloud Engineer': 'orange',
-    'Business Analyst': 'pink', 'Software Engineer': 'cyan'
-}
-fig, axes = plt.subplots(nrows=len(job_title_colors), ncols=1, sharex=True, figsize=(14, 16))
-axes = axes.flatten()
-for i, (job_title, color) in enumerate(job_title_colors.items()):
-    filtered_df = df[df['job_title_short'] == job_title]
-    jobs_per_day = filtered_df.groupby(filtered_df['job_posted_date'].dt.date).size()
-    axes[i].plot(jobs_per_day.index, jobs_per_day.values, linestyle='-', color=color, label=f'{job_title} (Original)')
-    x_values = np.arange(len(jobs_per_day))
-    z = np.polyfit(x_values, jobs_per_day.values, 1)
-    p = np.poly1d(z)
-    axes[i].plot(jobs_per_day.index, p(x_values), linestyle='--', color='black', label=f'{job_title} (Trend)')
-    axes[i].set_title(job_title)
-    axes[i].set_ylabel('Number of Jobs')
-    axes[i].legend()
-plt.xlabel('Date')
-plt.tight_layout()
-plt.savefig('eda_plots/job_posting_trends.png')
-plt.close()
+def plot_job_posting_trends(df, path):
+    job_title_colors = {
+        'Data Engineer': 'blue', 'Data Analyst': 'green', 'Data Scientist': 'red',
+        'Machine Learning Engineer': 'purple', 'Cloud Engineer': 'orange',
+        'Business Analyst': 'pink', 'Software Engineer': 'cyan'
+    }
+    fig, axes = plt.subplots(nrows=len(job_title_colors), ncols=1, sharex=True, figsize=(14, 16))
+    axes = axes.flatten()
+    for i, (job_title, color) in enumerate(job_title_colors.items()):
+        filtered_df = df[df['job_title_short'] == job_title]
+        jobs_per_day = filtered_df.groupby(filtered_df['job_posted_date'].dt.date).size()
+        axes[i].plot(jobs_per_day.index, jobs_per_day.values, linestyle='-', color=color, label=f'{job_title} (Original)')
+        x_values = np.arange(len(jobs_per_day))
+        z = np.polyfit(x_values, jobs_per_day.values, 1)
+        p = np.poly1d(z)
+        axes[i].plot(jobs_per_day.index, p(x_values), linestyle='--', color='black', label=f'{job_title} (Trend)')
+        axes[i].set_title(job_title)
+        axes[i].set_ylabel('Number of Jobs')
+        axes[i].legend()
+    plt.xlabel('Date')
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
 
 # 5. Job Posting Sources and Schedule Types
-df['job_via'] = df['job_via'].str.replace('via', '', regex=False).str.replace(r'.*Trabajo.*', 'Trabajo', regex=True)
-job_via_counts = df['job_via'].value_counts()
-sorted_job_via_counts = job_via_counts.sort_values(ascending=False).head(10)
-top_15_df = df[df['job_via'].isin(sorted_job_via_counts.index)]
-job_schedule_colors = {'Full-time': 'blue', 'Part-time': 'green', 'Contract': 'orange'}
-plot_data = top_15_df.groupby(['job_via', 'job_schedule_type']).size().unstack().fillna(0)
-plot_data = plot_data.loc[sorted_job_via_counts.index]
-plt.figure(figsize=(12, 8))
-ax = plot_data.plot(kind='barh', stacked=True, color=[job_schedule_colors.get(x, 'grey') for x in plot_data.columns], figsize=(12, 8))
-ax.invert_yaxis()
-plt.subplots_adjust(left=0.2, right=0.8, top=0.9, bottom=0.1)
-plt.xlabel('Number of Jobs')
-plt.ylabel('Job Via')
-plt.title('Number of Jobs by Job Via (Top 10) with Job Schedule Type')
-plt.legend(title='Job Schedule Type', bbox_to_anchor=(1.05, 1), loc='upper left')
-plt.tight_layout()
-plt.savefig('eda_plots/job_sources_and_schedules.png')
-plt.close()
+def plot_job_sources_and_schedules(df, path):
+    df = df.assign(job_via=normalize_column(df['job_via'], normalize_job_via))
+    job_via_counts = df['job_via'].value_counts()
+    sorted_job_via_counts = job_via_counts.sort_values(ascending=False).head(10)
+    top_15_df = df[df['job_via'].isin(sorted_job_via_counts.index)]
+    job_schedule_colors = {'Full-time': 'blue', 'Part-time': 'green', 'Contract': 'orange'}
+    plot_data = top_15_df.groupby(['job_via', 'job_schedule_type']).size().unstack().fillna(0)
+    plot_data = plot_data.loc[sorted_job_via_counts.index]
+    plt.figure(figsize=(12, 8))
+    ax = plot_data.plot(kind='barh', stacked=True, color=[job_schedule_colors.get(x, 'grey') for x in plot_data.columns], figsize=(12, 8))
+    ax.invert_yaxis()
+    plt.subplots_adjust(left=0.2, right=0.8, top=0.9, bottom=0.1)
+    plt.xlabel('Number of Jobs')
+    plt.ylabel('Job Via')
+    plt.title('Number of Jobs by Job Via (Top 10) with Job Schedule Type')
+    plt.legend(title='Job Schedule Type', bbox_to_anchor=(1.05, 1), loc='upper left')
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
 
 # 6. Job Schedule Type Distribution
-job_schedule_counts = df['job_schedule_type'].value_counts()
-plt.figure(figsize=(8, 8))
-plt.pie(job_schedule_counts, labels=job_schedule_counts.index, autopct='%1.1f%%', colors=sns.color_palette('pastel'))
-plt.title('Job Schedule Type Distribution')
-plt.savefig('eda_plots/job_schedule_distribution.png')
-plt.close()
+def plot_job_schedule_distribution(df, path):
+    job_schedule_counts = df['job_schedule_type'].value_counts()
+    job_schedule_counts = job_schedule_counts[job_schedule_counts > 0]
+    plt.figure(figsize=(8, 8))
+    plt.pie(job_schedule_counts, labels=job_schedule_counts.index, autopct='%1.1f%%', colors=sns.color_palette('pastel'))
+    plt.title('Job Schedule Type Distribution')
+    plt.savefig(path)
+    plt.close()
+
 
 # 7. Top Companies and Countries for Job Postings
-company_job_counts = df['company_name'].value_counts().head(10)
-company_countries = df.groupby('company_name')['job_country'].agg(lambda x: x.mode()[0])
-country_job_counts = df['job_country'].value_counts().head(10)
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(20, 8))
-sns.barplot(x=country_job_counts.index, y=country_job_counts.values, palette=sns.color_palette("magma", len(country_job_counts)), ax=ax1)
-ax1.set_xticklabels(ax1.get_xticklabels(), rotation=45, ha='right')
-ax1.set_xlabel('Country')
-ax1.set_ylabel('Number of Job Postings')
-ax1.set_title('Top 10 Countries by Job Postings')
-sns.barplot(x=company_job_counts.index, y=company_job_counts.values, palette=sns.color_palette("magma", len(company_job_counts)), ax=ax2)
-ax2.set_xticklabels(ax2.get_xticklabels(), rotation=45, ha='right')
-ax2.set_xlabel('Company Name')
-ax2.set_ylabel('Number of Jobs')
-ax2.set_title('Top 10 Companies by Number of Jobs')
-for i, company in enumerate(company_job_counts.index):
-    country = company_countries[company]
-    ax2.text(i, company_job_counts.values[i]/2, country, ha='center', va='center', rotation=90, color='white')
-plt.tight_layout()
-plt.savefig('eda_plots/top_companies_and_countries.png')
-plt.close()
+def plot_top_companies_and_countries(df, path):
+    top_companies = company_stats(df).head(10)
+    company_job_counts = top_companies['count']
+    company_countries = top_companies['job_country']
+    country_job_counts = df['job_country'].value_counts().head(10)
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(20, 8))
+    sns.barplot(x=country_job_counts.index, y=country_job_counts.values, palette=sns.color_palette("magma", len(country_job_counts)), ax=ax1)
+    ax1.set_xticklabels(ax1.get_xticklabels(), rotation=45, ha='right')
+    ax1.set_xlabel('Country')
+    ax1.set_ylabel('Number of Job Postings')
+    ax1.set_title('Top 10 Countries by Job Postings')
+    sns.barplot(x=company_job_counts.index, y=company_job_counts.values, palette=sns.color_palette("magma", len(company_job_counts)), ax=ax2)
+    ax2.set_xticklabels(ax2.get_xticklabels(), rotation=45, ha='right')
+    ax2.set_xlabel('Company Name')
+    ax2.set_ylabel('Number of Jobs')
+    ax2.set_title('Top 10 Companies by Number of Jobs')
+    for i, company in enumerate(company_job_counts.index):
+        country = company_countries[company]
+        ax2.text(i, company_job_counts.values[i]/2, country, ha='center', va='center', rotation=90, color='white')
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
 
 # 8. Top Skills by Job Title
-skills_expanded = []
-for _, row in df.dropna(subset=['job_skills']).iterrows():
-    job_title = row['job_title_short']
-    skills = row['job_skills'].replace('[', '').replace(']', '').replace("'", '').replace(',', '').split()
-    skills = [skill.lower() for skill in skills]
-    skills = ['power bi' if skill in ['power', 'bi'] else skill for skill in skills]
-    skills = [skill for skill in skills if skill not in ['not', 'specified']]
-    for skill in skills:
-        skills_expanded.append((skill, job_title))
-skills_df = pd.DataFrame(skills_expanded, columns=['Skill', 'job_title_short'])
-skills_counts = skills_df.groupby(['Skill', 'job_title_short']).size().unstack(fill_value=0)
-top_skills_counts = skills_counts.sum(axis=1).sort_values(ascending=False).head(20)
-top_skills_df = skills_counts.loc[top_skills_counts.index]
-custom_order = ['Data Engineer', 'Data Analyst', 'Data Scientist', 'Machine Learning Engineer', 'Cloud Engineer', 'Business Analyst', 'Software Engineer']
-plt.figure(figsize=(12, 8))
-ax = top_skills_df.plot(kind='barh', stacked=True, figsize=(12, 8), colormap='magma')
-ax.invert_yaxis()
-handles, labels = ax.get_legend_handles_labels()
-legend_dict = dict(zip(labels, handles))
-ordered_handles = [legend_dict[label] for label in custom_order if label in legend_dict]
-plt.legend(handles=ordered_handles, labels=[label for label in custom_order if label in legend_dict], title='Job Title')
-plt.xlabel('Count')
-plt.ylabel('Skill')
-plt.title('Top 20 Job Skills by Job Title')
-plt.tight_layout()
-plt.savefig('eda_plots/top_skills_by_job_title.png')
-plt.close()
+def plot_top_skills_by_job_title(df, path):
+    skills_counts = skill_title_counts(SkillIndex.build(df['job_skills']), df['job_title_short'])
+    top_skills_counts = skills_counts.sum(axis=1).sort_values(ascending=False).head(20)
+    top_skills_df = skills_counts.loc[top_skills_counts.index]
+    custom_order = ['Data Engineer', 'Data Analyst', 'Data Scientist', 'Machine Learning Engineer', 'Cloud Engineer', 'Business Analyst', 'Software Engineer']
+    plt.figure(figsize=(12, 8))
+    ax = top_skills_df.plot(kind='barh', stacked=True, figsize=(12, 8), colormap='magma')
+    ax.invert_yaxis()
+    handles, labels = ax.get_legend_handles_labels()
+    legend_dict = dict(zip(labels, handles))
+    ordered_handles = [legend_dict[label] for label in custom_order if label in legend_dict]
+    plt.legend(handles=ordered_handles, labels=[label for label in custom_order if label in legend_dict], title='Job Title')
+    plt.xlabel('Count')
+    plt.ylabel('Skill')
+    plt.title('Top 20 Job Skills by Job Title')
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
 
 # 9. Salary vs. Job Frequency
-grouped_df = df.groupby('job_title_short').agg({'num_jobs': 'sum', 'salary_year_avg': 'mean'}).reset_index()
-plt.figure(figsize=(12, 8))
-sns.scatterplot(x='salary_year_avg', y='num_jobs', size='num_jobs', hue='job_title_short', data=grouped_df, palette='plasma', sizes=(100, 2000))
-plt.xlabel('Average Annual Salary')
-plt.ylabel('Total Number of Jobs')
-plt.title('Salary vs. Total Job Frequency by Job Title')
-plt.legend(title='Job Title', bbox_to_anchor=(1.05, 1), loc='upper left')
-plt.grid(True)
-plt.tight_layout()
-plt.savefig('eda_plots/salary_vs_job_frequency.png')
-plt.close()
-
-print("All plots have been saved in the 'eda_plots' directory.")
+def plot_salary_vs_job_frequency(df, path):
+    grouped_df = df.groupby('job_title_short', observed=True).agg({'num_jobs': 'sum', 'salary_year_avg': 'mean'}).reset_index()
+    plt.figure(figsize=(12, 8))
+    sns.scatterplot(x='salary_year_avg', y='num_jobs', size='num_jobs', hue='job_title_short', data=grouped_df, palette='plasma', sizes=(100, 2000))
+    plt.xlabel('Average Annual Salary')
+    plt.ylabel('Total Number of Jobs')
+    plt.title('Salary vs. Total Job Frequency by Job Title')
+    plt.legend(title='Job Title', bbox_to_anchor=(1.05, 1), loc='upper left')
+    plt.grid(True)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+# Plot target name -> (plot function, input columns, output file)
+TARGETS = {
+    'jobs_by_title': (plot_jobs_by_title, ['job_title_short'], 'jobs_by_title.png'),
+    'job_titles_wordcloud': (plot_job_titles_wordcloud, ['job_title_short'], 'job_titles_wordcloud.png'),
+    'job_locations_heatmap': (plot_job_locations_heatmap, ['latitude', 'longitude'], 'job_locations_heatmap.html'),
+    'job_posting_trends': (plot_job_posting_trends, ['job_title_short', 'job_posted_date'], 'job_posting_trends.png'),
+    'job_sources_and_schedules': (plot_job_sources_and_schedules, ['job_via', 'job_schedule_type'], 'job_sources_and_schedules.png'),
+    'job_schedule_distribution': (plot_job_schedule_distribution, ['job_schedule_type'], 'job_schedule_distribution.png'),
+    'top_companies_and_countries': (plot_top_companies_and_countries, ['company_name', 'job_country'], 'top_companies_and_countries.png'),
+    'top_skills_by_job_title': (plot_top_skills_by_job_title, ['job_skills', 'job_title_short'], 'top_skills_by_job_title.png'),
+    'salary_vs_job_frequency': (plot_salary_vs_job_frequency, ['job_title_short', 'num_jobs', 'salary_year_avg'], 'salary_vs_job_frequency.png'),
+}
+
+
+def columns_hash(df, columns):
+    """Content hash of the columns a plot reads, used to skip plots whose inputs have not changed."""
+    hashes = pd.util.hash_pandas_object(df[columns], index=False)
+    return hashlib.sha1(hashes.to_numpy().tobytes()).hexdigest()[:16]
+
+
+def read_snapshot(snapshot, columns):
+    """Some columns of a Parquet snapshot, or of a posting store's partition files (ensure_snapshot's result)."""
+    return pq.ParquetDataset(snapshot, partitioning=None).read(columns=columns).to_pandas()
+
+
+def render_target(name, snapshot, plot_dir):
+    """Render one plot from the dataset snapshot, reading only its columns. Runs in a worker process."""
+    plot, columns, filename = TARGETS[name]
+    start = time.perf_counter()
+    df = read_snapshot(snapshot, columns)
+    plot(df, os.path.join(plot_dir, filename))
+    return time.perf_counter() - start
+
+
+def read_manifest():
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    with open(MANIFEST_PATH) as f:
+        return json.load(f)
+
+
+def write_manifest(manifest):
+    with open(MANIFEST_PATH + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(MANIFEST_PATH + '.tmp', MANIFEST_PATH)
+
+
+def run(data_path=DATA_PATH, targets=None, workers=None, force=False):
+    """Render the selected plot targets in parallel, skipping those whose input columns are unchanged."""
+    os.makedirs(PLOT_DIR, exist_ok=True)
+    targets = targets or list(TARGETS)
+    snapshot = ensure_snapshot(data_path)
+    # Only the columns the selected plots read are loaded for hashing
+    df = read_snapshot(snapshot, list(dict.fromkeys(col for name in targets for col in TARGETS[name][1])))
+    manifest = read_manifest()
+
+    timings = {}
+    pending = {}
+    for name in targets:
+        _, columns, filename = TARGETS[name]
+        content_hash = columns_hash(df, columns)
+        if not force and manifest.get(name) == content_hash and os.path.exists(os.path.join(PLOT_DIR, filename)):
+            timings[name] = None
+            continue
+        pending[name] = content_hash
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {name: pool.submit(render_target, name, snapshot, PLOT_DIR) for name in pending}
+        for name, future in futures.items():
+            timings[name] = future.result()
+            manifest[name] = pending[name]
+            write_manifest(manifest)
+    return timings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Render the EDA plots into eda_plots/.')
+    parser.add_argument('targets', nargs='*', help='plot targets to render (default: all; see --list)')
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per CPU)')
+    parser.add_argument('--force', action='store_true', help='render even when the input columns are unchanged')
+    parser.add_argument('--list', action='store_true', help='list the plot targets and exit')
+    args = parser.parse_args()
+    unknown = [name for name in args.targets if name not in TARGETS]
+    if unknown:
+        parser.error(f"unknown plot target(s): {', '.join(unknown)}; use --list to see the targets")
+
+    if args.list:
+        for name, (_, columns, filename) in TARGETS.items():
+            print(f"{name:<30} {filename:<35} {', '.join(columns)}")
+    else:
+        start = time.perf_counter()
+        timings = run(args.data, args.targets, args.workers, args.force)
+        for name, seconds in timings.items():
+            print(f"{name:<30} {'skipped (unchanged)' if seconds is None else f'{seconds:.2f}s'}")
+        print(f"All plots are up to date in the '{PLOT_DIR}' directory ({time.perf_counter() - start:.1f}s).")
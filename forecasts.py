@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_store import CACHE_DIR
+
+# Last date the prediction page lets users select
+FORECAST_END = '2024-12-31'
+FORECAST_COLUMNS = ['yhat', 'yhat_lower', 'yhat_upper']
+
+
+def forecast_table(model, end=FORECAST_END):
+    """Daily forecast with intervals from the start of the model's history through the end of the horizon."""
+    start = model.history['ds'].min()
+    future = pd.DataFrame({'ds': pd.date_range(start, end, freq='D')})
+    forecast = model.predict(future)
+    return forecast.set_index('ds')[FORECAST_COLUMNS].astype('float32')
+
+
+def cached_forecast_table(job_type, model_version, load_model):
+    """Forecast table for a model, predicted once per model file version and kept on disk."""
+    path = os.path.join(CACHE_DIR, f'forecast-{job_type}-{model_version}.parquet')
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+
+    model = load_model()
+    if model is None:
+        return None
+    table = forecast_table(model)
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = path + '.tmp'
+    table.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+
+    # Forecasts of the job type's older model versions are no longer reachable
+    prefix = f'forecast-{job_type}-'
+    for name in os.listdir(CACHE_DIR):
+        old = os.path.join(CACHE_DIR, name)
+        version = name[len(prefix):-len('.parquet')]
+        if name.startswith(prefix) and name.endswith('.parquet') and '-' not in version and old != path:
+            os.remove(old)
+    return table
+
+
+def slice_forecast(table, start_date, end_date):
+    """Rows of a forecast table between two dates, inclusive, with ds as a column."""
+    return table.loc[pd.Timestamp(start_date):pd.Timestamp(end_date)].reset_index()
+
+
+def country_shares(cube, z=1.96):
+    """Share of each title's postings per country, with Wilson score bounds, indexed by (title, country)."""
+    counts = cube.query(['job_title_short', 'job_country'])['count']
+    counts = counts[counts > 0]
+    totals = counts.groupby(level='job_title_short', observed=True).transform('sum')
+
+    share = counts / totals
+    denominator = 1 + z ** 2 / totals
+    center = (share + z ** 2 / (2 * totals)) / denominator
+    half_width = z * np.sqrt(share * (1 - share) / totals + z ** 2 / (4 * totals ** 2)) / denominator
+    return pd.DataFrame({
+        'share': share,
+        'share_lower': (center - half_width).clip(lower=0),
+        'share_upper': (center + half_width).clip(upper=1),
+    }).astype('float32')
+
+
+def country_forecast(forecast, shares, job_type, country):
+    """Scale a title's forecast to one country; the interval combines forecast and share uncertainty."""
+    if (job_type, country) in shares.index:
+        share = shares.loc[(job_type, country)]
+    else:
+        share = pd.Series({'share': 0.0, 'share_lower': 0.0, 'share_upper': 0.0})
+    forecast = forecast.copy()
+    forecast['yhat'] = forecast['yhat'] * share['share']
+    forecast['yhat_lower'] = forecast['yhat_lower'].clip(lower=0) * share['share_lower']
+    forecast['yhat_upper'] = forecast['yhat_upper'] * share['share_upper']
+    return forecast
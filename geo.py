@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+# Grid cell size in degrees; 1 degree is roughly 111 km at the equator
+CELL_DEGREES = 1.0
+MAX_HEAT_POINTS = 2000
+
+
+def bin_locations(df, cell_degrees=CELL_DEGREES, by='job_title_short'):
+    """Posting counts per grid cell (and per value of `by`), located at the cell centres."""
+    located = df['latitude'].notna() & df['longitude'].notna()
+    lat = df.loc[located, 'latitude'].to_numpy(dtype=np.float64)
+    lon = df.loc[located, 'longitude'].to_numpy(dtype=np.float64)
+
+    cells = pd.DataFrame({
+        'latitude': (np.floor(lat / cell_degrees) + 0.5) * cell_degrees,
+        'longitude': (np.floor(lon / cell_degrees) + 0.5) * cell_degrees,
+    })
+    keys = ['latitude', 'longitude']
+    if by is not None:
+        cells[by] = df.loc[located, by].to_numpy()
+        keys = [by] + keys
+    return cells.groupby(keys, observed=True).size().rename('count').reset_index()
+
+
+def heat_points(bins, job_title=None, max_points=MAX_HEAT_POINTS):
+    """[lat, lon, weight] triples for folium's HeatMap, optionally for one title, heaviest cells first."""
+    if job_title is not None:
+        bins = bins[bins['job_title_short'] == job_title]
+    cells = bins.groupby(['latitude', 'longitude'])['count'].sum()
+    cells = cells.sort_values(ascending=False).head(max_points)
+    if cells.empty:
+        return []
+    weights = cells / cells.iloc[0]
+    return [[lat, lon, weight] for (lat, lon), weight in weights.items()]
+
+
+def heat_map(points, zoom_start=2):
+    """Folium map with a heat layer over the given weighted points."""
+    import folium
+    from folium.plugins import HeatMap
+
+    if points:
+        weights = np.array([point[2] for point in points])
+        center = [np.average([point[0] for point in points], weights=weights),
+                  np.average([point[1] for point in points], weights=weights)]
+    else:
+        center = [20, 0]
+    m = folium.Map(location=center, zoom_start=zoom_start)
+    HeatMap(points).add_to(m)
+    return m
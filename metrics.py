@@ -0,0 +1,211 @@
+import functools
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+# Histogram bucket upper bounds in seconds, as exported to Prometheus
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Recent observations kept per timer for the admin page's percentiles
+WINDOW = 1000
+METRIC_PREFIX = 'data_jobs'
+
+
+class Metrics:
+    """Process-wide latency timers and cache counters.
+
+    Timers are grouped by kind ('page' or 'stage') and name. Each keeps
+    cumulative Prometheus histogram buckets plus a rolling window of recent
+    latencies for percentiles. Cache counters record lookups and misses per
+    named cache.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS, window=WINDOW):
+        self.buckets = buckets
+        self.window = window
+        self.lock = threading.Lock()
+        self.timers = {}
+        self.cache_lookups = defaultdict(int)
+        self.cache_misses = defaultdict(int)
+        self.gauges = {}
+
+    def observe(self, kind, name, seconds):
+        with self.lock:
+            timer = self.timers.get((kind, name))
+            if timer is None:
+                timer = self.timers[(kind, name)] = {
+                    'buckets': [0] * len(self.buckets), 'count': 0, 'sum': 0.0, 'recent': deque(maxlen=self.window),
+                }
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    timer['buckets'][i] += 1
+            timer['count'] += 1
+            timer['sum'] += seconds
+            timer['recent'].append(seconds)
+
+    @contextmanager
+    def timer(self, kind, name):
+        """Time the enclosed block; it is recorded even if the block raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(kind, name, time.perf_counter() - start)
+
+    def page(self, name):
+        return self.timer('page', name)
+
+    def stage(self, name):
+        return self.timer('stage', name)
+
+    def count_lookup(self, cache):
+        with self.lock:
+            self.cache_lookups[cache] += 1
+
+    def count_miss(self, cache):
+        with self.lock:
+            self.cache_misses[cache] += 1
+
+    def set_gauge(self, name, value, help_text=''):
+        with self.lock:
+            self.gauges[name] = (value, help_text)
+
+    def latency_table(self, kind):
+        """Rolling-window latency summary per timer of one kind, slowest p95 first."""
+        with self.lock:
+            rows = {name: (timer['count'], np.array(timer['recent'])) for (k, name), timer in self.timers.items() if k == kind}
+        table = pd.DataFrame.from_dict({
+            name: {
+                'count': count,
+                'mean_ms': recent.mean() * 1000,
+                'p50_ms': np.percentile(recent, 50) * 1000,
+                'p95_ms': np.percentile(recent, 95) * 1000,
+                'max_ms': recent.max() * 1000,
+            }
+            for name, (count, recent) in rows.items()
+        }, orient='index', columns=['count', 'mean_ms', 'p50_ms', 'p95_ms', 'max_ms'])
+        return table.rename_axis(kind).sort_values('p95_ms', ascending=False)
+
+    def cache_table(self):
+        with self.lock:
+            lookups = dict(self.cache_lookups)
+            misses = dict(self.cache_misses)
+        table = pd.DataFrame({'lookups': pd.Series(lookups, dtype='int64'), 'misses': pd.Series(misses, dtype='int64')})
+        table = table.fillna(0).astype('int64')
+        table['hits'] = table['lookups'] - table['misses']
+        table['hit_rate'] = table['hits'] / table['lookups'].where(table['lookups'] > 0)
+        return table.rename_axis('cache').sort_index()
+
+    def prometheus_text(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            for kind in ('page', 'stage'):
+                metric = f'{METRIC_PREFIX}_{kind}_seconds'
+                lines.append(f'# HELP {metric} Latency of each app {kind} per script run.')
+                lines.append(f'# TYPE {metric} histogram')
+                for (k, name), timer in sorted(self.timers.items()):
+                    if k != kind:
+                        continue
+                    label = f'{kind}="{escape_label(name)}"'
+                    for bound, count in zip(self.buckets, timer['buckets']):
+                        lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {count}')
+                    lines.append(f'{metric}_bucket{{{label},le="+Inf"}} {timer["count"]}')
+                    lines.append(f'{metric}_sum{{{label}}} {timer["sum"]:.6f}')
+                    lines.append(f'{metric}_count{{{label}}} {timer["count"]}')
+
+            for metric, counts, help_text in (
+                (f'{METRIC_PREFIX}_cache_lookups_total', self.cache_lookups, 'Calls to each cached loader.'),
+                (f'{METRIC_PREFIX}_cache_misses_total', self.cache_misses, 'Calls that had to compute the cached value.'),
+            ):
+                lines.append(f'# HELP {metric} {help_text}')
+                lines.append(f'# TYPE {metric} counter')
+                for name in sorted(self.cache_lookups):
+                    lines.append(f'{metric}{{cache="{escape_label(name)}"}} {counts.get(name, 0)}')
+
+            for name, (value, help_text) in sorted(self.gauges.items()):
+                metric = f'{METRIC_PREFIX}_{name}'
+                lines.append(f'# HELP {metric} {help_text}')
+                lines.append(f'# TYPE {metric} gauge')
+                lines.append(f'{metric} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path):
+        """Write the Prometheus text atomically, for node_exporter's textfile collector or any file scraper."""
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        # A unique temp name per call, since sessions write after every run and may do so concurrently
+        with tempfile.NamedTemporaryFile('w', dir=directory, prefix=os.path.basename(path) + '.',
+                                         suffix='.tmp', delete=False) as f:
+            f.write(self.prometheus_text())
+        try:
+            # NamedTemporaryFile creates the file owner-only; collectors often run as another user
+            os.chmod(f.name, 0o644)
+            os.replace(f.name, path)
+        except OSError:
+            os.remove(f.name)
+            raise
+
+    def serve(self, port, host='127.0.0.1'):
+        """Serve the Prometheus text at http://host:port/metrics from a daemon thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name='metrics-endpoint', daemon=True).start()
+        return server
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Shared by every session in the process
+METRICS = Metrics()
+
+
+def counted_cache(cache, name=None, metrics=METRICS, **options):
+    """Wrap a caching decorator such as st.cache_data so its lookups and misses are counted.
+
+    The wrapped function body only runs on a miss, so every call is a
+    lookup and every body run is a miss.
+    """
+    def decorate(func):
+        cache_name = name or func.__name__
+
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            metrics.count_miss(cache_name)
+            return func(*args, **kwargs)
+
+        cached = cache(**options)(compute) if options else cache(compute)
+
+        @functools.wraps(func)
+        def lookup(*args, **kwargs):
+            metrics.count_lookup(cache_name)
+            return cached(*args, **kwargs)
+
+        lookup.clear = cached.clear
+        return lookup
+
+    return decorate
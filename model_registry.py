@@ -0,0 +1,236 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+
+MODEL_DIR = 'model_files'
+MANIFEST_NAME = 'manifest.json'
+MODEL_SUFFIX = '_job_prediction_model'
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_manifest(model_dir=MODEL_DIR):
+    path = os.path.join(model_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def manifest_stamp(model_dir=MODEL_DIR):
+    """Cheap identifier of the manifest file's current state: its mtime and size, or None if it is missing."""
+    try:
+        stat = os.stat(os.path.join(model_dir, MANIFEST_NAME))
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def write_manifest(manifest, model_dir=MODEL_DIR):
+    path = os.path.join(model_dir, MANIFEST_NAME)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+def manifest_entry(model, path, **extra):
+    import prophet
+
+    entry = {
+        'file': os.path.basename(path),
+        'sha256': checksum(path),
+        'training_start': str(model.history['ds'].min().date()),
+        'training_end': str(model.history['ds'].max().date()),
+        'prophet_version': prophet.__version__,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    entry.update(extra)
+    return entry
+
+
+def save_model(model, job_type, model_dir=MODEL_DIR, manifest=None, **extra):
+    """Write a model in Prophet's JSON format and record it in the manifest."""
+    from prophet.serialize import model_to_json
+
+    path = os.path.join(model_dir, f'{job_type}{MODEL_SUFFIX}.json')
+    with open(path + '.tmp', 'w') as f:
+        f.write(model_to_json(model))
+    os.replace(path + '.tmp', path)
+
+    update_manifest = manifest is None
+    if update_manifest:
+        manifest = read_manifest(model_dir)
+    version = manifest.get(job_type, {}).get('version', 0) + 1
+    manifest[job_type] = manifest_entry(model, path, version=version, **extra)
+    if update_manifest:
+        write_manifest(manifest, model_dir)
+    return manifest[job_type]
+
+
+def convert_pickles(model_dir=MODEL_DIR):
+    """Re-save every pickled model in JSON format, so artifacts no longer depend on exact library versions."""
+    manifest = read_manifest(model_dir)
+    for name in sorted(os.listdir(model_dir)):
+        if name.endswith(MODEL_SUFFIX + '.pkl'):
+            job_type = name[:-len(MODEL_SUFFIX + '.pkl')]
+            with open(os.path.join(model_dir, name), 'rb') as f:
+                model = pickle.load(f)
+            save_model(model, job_type, model_dir, manifest)
+    write_manifest(manifest, model_dir)
+    return manifest
+
+
+class ModelRegistry:
+    """Forecast models in a directory, loaded lazily and at most once, with per-model load statistics.
+
+    The manifest is re-read whenever the file changes on disk (train_models.py
+    rewrites it after a retrain), and models whose entries changed are
+    dropped, so a long-running app picks up new models and versions.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR):
+        self.model_dir = model_dir
+        self.manifest_stamp = manifest_stamp(model_dir)
+        self.manifest = read_manifest(model_dir)
+        self.models = {}
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.warm_up_thread = None
+
+    def refresh(self):
+        """Re-read the manifest if it changed since it was last read, forgetting models whose entries changed."""
+        stamp = manifest_stamp(self.model_dir)
+        if stamp == self.manifest_stamp:
+            return
+        with self.lock:
+            manifest = read_manifest(self.model_dir)
+            for job_type in list(self.models):
+                if manifest.get(job_type) != self.manifest.get(job_type):
+                    del self.models[job_type]
+                    self.stats.pop(job_type, None)
+            self.manifest = manifest
+            self.manifest_stamp = stamp
+
+    def job_types(self):
+        found = set(self.manifest)
+        for name in os.listdir(self.model_dir):
+            stem, ext = os.path.splitext(name)
+            if stem.endswith(MODEL_SUFFIX) and ext in ('.json', '.pkl'):
+                found.add(stem[:-len(MODEL_SUFFIX)])
+        return sorted(found)
+
+    def path(self, job_type):
+        """Model file for a job type, preferring the JSON artifact over a legacy pickle."""
+        for ext in ('.json', '.pkl'):
+            path = os.path.join(self.model_dir, f'{job_type}{MODEL_SUFFIX}{ext}')
+            if os.path.exists(path):
+                return path
+        return None
+
+    def version(self, job_type):
+        """Identifier that changes whenever the model artifact changes."""
+        self.refresh()
+        entry = self.manifest.get(job_type)
+        if entry and os.path.exists(os.path.join(self.model_dir, entry['file'])):
+            return entry['sha256'][:16]
+        path = self.path(job_type)
+        if path is None:
+            return None
+        return checksum(path)[:16]
+
+    def _load(self, job_type):
+        path = self.path(job_type)
+        if path is None:
+            return None
+
+        rss_before = psutil.Process().memory_info().rss if psutil else None
+        start = time.perf_counter()
+        if path.endswith('.json'):
+            from prophet.serialize import model_from_json
+
+            entry = self.manifest.get(job_type)
+            if entry and entry['file'] == os.path.basename(path) and checksum(path) != entry['sha256']:
+                # Skip the model rather than fail the caller (or the warm-up of every later model)
+                logger.warning('Checksum mismatch for %s; the manifest is out of date, skipping the model', path)
+                self.stats[job_type] = {
+                    'file': os.path.basename(path),
+                    'load_seconds': None,
+                    'rss_delta_mb': None,
+                    'error': 'checksum mismatch',
+                }
+                return None
+            with open(path) as f:
+                model = model_from_json(f.read())
+        else:
+            with open(path, 'rb') as f:
+                model = pickle.load(f)
+
+        self.stats[job_type] = {
+            'file': os.path.basename(path),
+            'load_seconds': time.perf_counter() - start,
+            'rss_delta_mb': (psutil.Process().memory_info().rss - rss_before) / 2 ** 20 if psutil else None,
+        }
+        return model
+
+    def get(self, job_type):
+        self.refresh()
+        try:
+            return self.models[job_type]
+        except KeyError:
+            pass
+        with self.lock:
+            if job_type not in self.models:
+                self.models[job_type] = self._load(job_type)
+            return self.models[job_type]
+
+    def warm_up(self, background=True):
+        """Load every model, by default in a daemon thread so server start is not delayed."""
+        def load_all():
+            for job_type in self.job_types():
+                self.get(job_type)
+
+        if not background:
+            load_all()
+            return None
+        if self.warm_up_thread is None:
+            self.warm_up_thread = threading.Thread(target=load_all, name='model-warm-up', daemon=True)
+            self.warm_up_thread.start()
+        return self.warm_up_thread
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Manage the forecast model registry.')
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--convert', action='store_true', help='convert pickled models to JSON and write the manifest')
+    args = parser.parse_args()
+
+    if args.convert:
+        convert_pickles(args.model_dir)
+
+    registry = ModelRegistry(args.model_dir)
+    registry.warm_up(background=False)
+    for job_type in registry.job_types():
+        entry = registry.manifest.get(job_type, {})
+        stats = registry.stats.get(job_type, {})
+        rss = f"{stats['rss_delta_mb']:.1f} MB" if stats.get('rss_delta_mb') is not None else 'n/a'
+        load = stats.get('error') or f"load {(stats.get('load_seconds') or 0) * 1000:.0f} ms, rss {rss}"
+        print(f"{job_type:<28} {stats.get('file', '-'):<50} "
+              f"{entry.get('training_start', '?')}..{entry.get('training_end', '?')} {load}")
@@ -0,0 +1,66 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Rule sets shared by cleaning.py and eda.py. Each is applied to the distinct
+# values of a column only and mapped back to the rows through categorical codes.
+
+# First matching pattern wins; anything unmatched becomes 'Others'
+SCHEDULE_RULES = [
+    (r'\bfull[-\s]?time\b', 'Full-time'),      # Match "full time", "full-time", "full time ", etc.
+    (r'\bpart[-\s]?time\b', 'Part-time'),      # Match "part time", "part-time", "part time ", etc.
+    (r'\bcontractor\b', 'Contract'),           # Match "contractor" in any case
+    (r'\binternship\b', 'Internship'),         # Match "internship" in any case
+]
+SCHEDULE_DEFAULT = 'Others'
+
+# Applied in order, each to the result of the previous one
+JOB_VIA_RULES = [
+    ('via', ''),                  # Drop the "via" prefix
+    (r'.*Trabajo.*', 'Trabajo'),  # Collapse the many Trabajo.org portals into one
+]
+
+
+def classify(rules, default):
+    """Rule function returning the label of the first pattern found in a value, case-insensitively."""
+    compiled = [(re.compile(pattern, re.IGNORECASE), label) for pattern, label in rules]
+
+    def apply(value):
+        for pattern, label in compiled:
+            if pattern.search(value):
+                return label
+        return default
+    return apply
+
+
+def replace_all(rules):
+    """Rule function applying regex substitutions in sequence."""
+    compiled = [(re.compile(pattern), replacement) for pattern, replacement in rules]
+
+    def apply(value):
+        for pattern, replacement in compiled:
+            value = pattern.sub(replacement, value)
+        return value
+    return apply
+
+
+normalize_schedule_type = classify(SCHEDULE_RULES, SCHEDULE_DEFAULT)
+normalize_job_via = replace_all(JOB_VIA_RULES)
+
+
+def normalize_column(series, rule):
+    """Apply a rule function to the distinct values of a column and return a categorical column.
+
+    The cost depends on the column's cardinality rather than its length;
+    missing values stay missing.
+    """
+    values = series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype('category')
+    mapped = np.array([rule(str(category)) for category in values.cat.categories], dtype=object)
+    categories, inverse = np.unique(mapped, return_inverse=True)
+
+    codes = values.cat.codes.to_numpy()
+    new_codes = np.full(len(codes), -1, dtype=np.int64)
+    present = codes >= 0
+    new_codes[present] = inverse[codes[present]]
+    return pd.Series(pd.Categorical.from_codes(new_codes, categories=categories), index=series.index, name=series.name)
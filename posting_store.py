@@ -0,0 +1,269 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from aggregates import CUBE_DIMENSIONS, JobCube
+from cleaning import clean_chunk, collect_stats, output_schema, peak_rss_mb, read_chunks, read_stats, write_stats
+from data_store import apply_schema, file_fingerprint
+from skills import explode_skills
+
+STORE_DIR = 'Data/store'
+MANIFEST_NAME = 'manifest.json'
+STATS_NAME = 'stats.json'
+COORDS_NAME = 'coords.parquet'
+CELL_MEASURES = ['count', 'salary_sum', 'salary_count']
+SKILL_KEYS = ['skill', 'job_title_short']
+
+
+def posting_months(dates):
+    """Partition key of each posting: its posting month as 'YYYY-MM'."""
+    return dates.dt.strftime('%Y-%m').fillna('unknown')
+
+
+def add_cells(frames):
+    """Sum JobCube cell tables over the same dimensions."""
+    cells = pd.concat(frames, ignore_index=True)
+    return cells.groupby(CUBE_DIMENSIONS, observed=True, dropna=False, sort=False)[CELL_MEASURES].sum().reset_index()
+
+
+def add_skill_counts(frames):
+    skills = pd.concat(frames, ignore_index=True)
+    return skills.groupby(SKILL_KEYS, observed=True, dropna=False, sort=False)['count'].sum().reset_index()
+
+
+def skill_pairs(cleaned, months):
+    """(month, skill, job title) posting counts of one cleaned chunk."""
+    row_ids, skill_ids, names = explode_skills(cleaned['job_skills'])
+    pairs = pd.DataFrame({
+        'month': months.to_numpy()[row_ids],
+        'skill': names[skill_ids],
+        'job_title_short': cleaned['job_title_short'].to_numpy()[row_ids],
+    })
+    return pairs.groupby(['month'] + SKILL_KEYS, observed=True, dropna=False, sort=False).size().rename('count').reset_index()
+
+
+def write_parquet(df, path, schema=None):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    pq.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False), tmp_path)
+    os.replace(tmp_path, path)
+
+
+class PostingStore:
+    """Cleaned postings partitioned by posting month, with per-month aggregates updated on every append.
+
+    Layout under the store directory:
+
+        manifest.json                                 batches, partition files and the store version
+        stats.json                                    cleaning statistics every batch is cleaned with
+        postings/month=2023-01/part-<batch>-<n>.parquet
+        aggregates/month=2023-01/cells-<version>.parquet   JobCube cells (counts and salary sums)
+        aggregates/month=2023-01/skills-<version>.parquet  (skill, job title) posting counts
+
+    A batch is cleaned with the statistics collected from the store's first
+    batch (schedule mode, salary means and outlier fences), so appending
+    never reprocesses earlier postings: only the months a batch touches get
+    new part files and re-summed aggregates. Readers go through the
+    manifest, which is replaced last, so an interrupted append is invisible
+    and can simply be run again. Run cleaning.py on the full raw file and
+    create a new store to refresh the statistics themselves.
+    """
+
+    def __init__(self, path=STORE_DIR):
+        self.path = path
+        with open(os.path.join(path, MANIFEST_NAME)) as f:
+            self.manifest = json.load(f)
+
+    @classmethod
+    def create(cls, path, raw_path, chunksize=100_000, coords_path=None):
+        """New store whose cleaning statistics come from raw_path, holding raw_path as its first batch."""
+        if os.path.exists(os.path.join(path, MANIFEST_NAME)):
+            raise FileExistsError(f'{path} already holds a posting store')
+        os.makedirs(path, exist_ok=True)
+        write_stats(collect_stats(raw_path, chunksize), os.path.join(path, STATS_NAME))
+        if coords_path:
+            coords = pd.read_csv(coords_path).set_index('job_country')[['latitude', 'longitude']]
+            coords.to_parquet(os.path.join(path, COORDS_NAME))
+
+        store = cls.__new__(cls)
+        store.path = path
+        store.manifest = {'version': None, 'columns': None, 'batches': [], 'months': {}}
+        report = store.append(raw_path, chunksize)
+        return store, report
+
+    @property
+    def version(self):
+        return self.manifest['version']
+
+    @property
+    def columns(self):
+        return self.manifest['columns']
+
+    def months(self):
+        return sorted(self.manifest['months'])
+
+    def full_path(self, name):
+        return os.path.join(self.path, name)
+
+    def files(self):
+        """Paths of every postings part file, oldest month first."""
+        return [self.full_path(part) for month in self.months() for part in self.manifest['months'][month]['parts']]
+
+    def country_coords(self):
+        path = self.full_path(COORDS_NAME)
+        return pd.read_parquet(path) if os.path.exists(path) else None
+
+    def append(self, raw_path, chunksize=100_000):
+        """Clean a batch of raw postings and add it; returns a report, or None if the batch was already added."""
+        start = time.perf_counter()
+        batch_id = file_fingerprint(raw_path)
+        if any(batch['id'] == batch_id for batch in self.manifest['batches']):
+            return None
+
+        stats = read_stats(self.full_path(STATS_NAME))
+        country_coords = self.country_coords()
+        columns = self.columns
+        parts, month_rows, cells, skills = {}, {}, {}, []
+        rows_in = rows_out = 0
+
+        for i, chunk in enumerate(read_chunks(raw_path, chunksize)):
+            rows_in += len(chunk)
+            cleaned = clean_chunk(chunk, stats, country_coords)
+            if cleaned.empty:
+                continue
+            cleaned['date_only'] = cleaned['job_posted_date'].dt.normalize()
+            if columns is None:
+                columns = list(cleaned.columns)
+            missing = sorted(set(columns) - set(cleaned.columns))
+            if missing:
+                raise ValueError(f"{raw_path} lacks the store's columns: {', '.join(missing)}")
+            cleaned = cleaned[columns]
+            rows_out += len(cleaned)
+
+            months = posting_months(cleaned['date_only'])
+            for month, rows in cleaned.groupby(months, sort=False):
+                part = f'postings/month={month}/part-{batch_id}-{i:04d}.parquet'
+                write_parquet(rows, self.full_path(part), output_schema(columns))
+                parts.setdefault(month, []).append(part)
+                month_rows[month] = month_rows.get(month, 0) + len(rows)
+
+            chunk_cells = JobCube.build(cleaned).cells
+            for month, month_cells in chunk_cells.groupby(posting_months(chunk_cells['date_only']), sort=False):
+                cells.setdefault(month, []).append(month_cells)
+            skills.append(skill_pairs(cleaned, months))
+
+        version = hashlib.sha1(f"{self.version}:{batch_id}".encode()).hexdigest()[:16]
+        skills = pd.concat(skills, ignore_index=True) if skills else pd.DataFrame(columns=['month'] + SKILL_KEYS + ['count'])
+        manifest_months = {month: dict(entry) for month, entry in self.manifest['months'].items()}
+        replaced = []
+
+        # Only the aggregates of months this batch touches are read and rewritten
+        for month in parts:
+            entry = manifest_months.setdefault(month, {'rows': 0, 'parts': [], 'cells': None, 'skills': None})
+            month_cells = cells[month]
+            month_skills = [skills.loc[skills['month'] == month, SKILL_KEYS + ['count']]]
+            if entry['cells']:
+                month_cells = [pd.read_parquet(self.full_path(entry['cells']))] + month_cells
+                month_skills = [pd.read_parquet(self.full_path(entry['skills']))] + month_skills
+                replaced += [entry['cells'], entry['skills']]
+
+            entry['cells'] = f'aggregates/month={month}/cells-{version}.parquet'
+            entry['skills'] = f'aggregates/month={month}/skills-{version}.parquet'
+            write_parquet(add_cells(month_cells), self.full_path(entry['cells']))
+            write_parquet(add_skill_counts(month_skills), self.full_path(entry['skills']))
+            entry['parts'] = entry['parts'] + parts[month]
+            entry['rows'] += month_rows[month]
+
+        batch = {
+            'id': batch_id,
+            'source': os.path.abspath(raw_path),
+            'ingested': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'rows_in': rows_in,
+            'rows_out': rows_out,
+            'months': sorted(parts),
+        }
+        manifest = {
+            'version': version,
+            'columns': columns,
+            'batches': self.manifest['batches'] + [batch],
+            'months': manifest_months,
+        }
+        tmp_path = self.full_path(MANIFEST_NAME) + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.full_path(MANIFEST_NAME))
+        self.manifest = manifest
+
+        for name in replaced:
+            os.remove(self.full_path(name))
+
+        seconds = time.perf_counter() - start
+        return {
+            **batch,
+            'seconds': seconds,
+            'rows_per_second': rows_in / seconds if seconds else 0.0,
+            'peak_rss_mb': peak_rss_mb(),
+        }
+
+    def load(self, schema=None):
+        """All postings; with a schema, only its columns (those the store has), cast to its dtypes."""
+        columns = None if schema is None else [col for col in schema if col in self.columns]
+        df = pq.ParquetDataset(self.files(), partitioning=None).read(columns=columns).to_pandas()
+        return df if schema is None else apply_schema(df, schema)
+
+    def cells(self):
+        """JobCube cells of the whole store: counts and salary sums per dimension combination."""
+        return pd.concat([pd.read_parquet(self.full_path(self.manifest['months'][month]['cells']))
+                          for month in self.months()], ignore_index=True)
+
+    def skill_title_counts(self):
+        """Skill x job title posting counts, in the layout of skills.skill_title_counts."""
+        skills = add_skill_counts([pd.read_parquet(self.full_path(self.manifest['months'][month]['skills']))
+                                   for month in self.months()])
+        counts = skills.pivot_table(index='skill', columns='job_title_short', values='count', aggfunc='sum', fill_value=0)
+        return counts.astype(np.int32).rename_axis(index='Skill', columns='job_title_short')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Keep cleaned postings in a month-partitioned store and append new batches.')
+    parser.add_argument('--store', default=STORE_DIR)
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    commands = parser.add_subparsers(dest='command', required=True)
+    create_parser = commands.add_parser('create', help='start a store from a raw postings CSV, collecting its cleaning statistics')
+    create_parser.add_argument('raw')
+    create_parser.add_argument('--coords', help='CSV with job_country, latitude and longitude columns')
+    append_parser = commands.add_parser('append', help='clean raw postings CSVs and add them to the store')
+    append_parser.add_argument('raw', nargs='+')
+    commands.add_parser('info', help='list the partitions and batches')
+    args = parser.parse_args()
+
+    def print_report(report):
+        print(f"{report['source']}: {report['rows_in']:,} rows in, {report['rows_out']:,} rows out in "
+              f"{report['seconds']:.1f}s ({report['rows_per_second']:,.0f} rows/s), "
+              f"months {', '.join(report['months']) or '-'}, peak RSS {report['peak_rss_mb']:.0f} MB")
+
+    if args.command == 'create':
+        store, report = PostingStore.create(args.store, args.raw, args.chunksize, args.coords)
+        print_report(report)
+    elif args.command == 'append':
+        store = PostingStore(args.store)
+        for raw_path in args.raw:
+            report = store.append(raw_path, args.chunksize)
+            if report is None:
+                print(f'{raw_path}: already in the store, skipped')
+            else:
+                print_report(report)
+    else:
+        store = PostingStore(args.store)
+    print(f'\n{args.store} version {store.version}: {len(store.manifest["batches"])} batches')
+    for month in store.months():
+        entry = store.manifest['months'][month]
+        print(f"  {month}  {entry['rows']:>10,} rows  {len(entry['parts']):>4} files")
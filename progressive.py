@@ -0,0 +1,199 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from aggregates import JobCube
+
+STRATA = ['job_title_short', 'job_country']
+SAMPLE_FRACTION = 0.05
+MIN_STRATUM_ROWS = 30
+
+
+def stratified_sample(df, fraction=SAMPLE_FRACTION, min_rows=MIN_STRATUM_ROWS, strata=STRATA, seed=0):
+    """Simple random sample within every stratum, at least min_rows (or the whole stratum) each.
+
+    Returns the sampled row positions in ascending order and a table of
+    stratum sizes: population, sample and per-row weight (population / sample).
+    """
+    stratum_ids = df.groupby(strata, observed=True, sort=False, dropna=False).ngroup().to_numpy()
+    population = np.bincount(stratum_ids)
+    sample = np.minimum(population, np.maximum(np.ceil(population * fraction), min_rows)).astype(np.int64)
+
+    # Order rows by stratum, then by a random key, and keep each stratum's first `sample` rows
+    keys = np.random.default_rng(seed).random(len(df))
+    order = np.lexsort((keys, stratum_ids))
+    starts = np.concatenate([[0], np.cumsum(population)[:-1]])
+    rank = np.arange(len(df)) - starts[stratum_ids[order]]
+    rows = np.sort(order[rank < sample[stratum_ids[order]]])
+
+    _, first_rows = np.unique(stratum_ids, return_index=True)
+    sizes = df[strata].iloc[first_rows].reset_index(drop=True)
+    sizes['population'] = population
+    sizes['sample'] = sample
+    sizes['weight'] = population / sample
+    return rows, sizes, stratum_ids
+
+
+def sample_frame(df, fraction=SAMPLE_FRACTION, min_rows=MIN_STRATUM_ROWS, seed=0):
+    """The sampled postings, with their dataset row position, weight and stratum sizes as extra columns.
+
+    Drawn once when the dataset snapshot is built (see data_store), so the
+    app can read the sample without touching the full dataset.
+    """
+    rows, sizes, stratum_ids = stratified_sample(df, fraction, min_rows, seed=seed)
+    sample = df.iloc[rows].reset_index(drop=True)
+    sample_strata = stratum_ids[rows]
+    sample['row'] = rows
+    sample['weight'] = sizes['weight'].to_numpy()[sample_strata]
+    sample['stratum_population'] = sizes['population'].to_numpy()[sample_strata]
+    sample['stratum_sample'] = sizes['sample'].to_numpy()[sample_strata]
+    return sample
+
+
+class SampleCube(JobCube):
+    """JobCube over a stratified sample, weighted to estimate the full dataset.
+
+    rows holds the dataset positions of the sampled postings, so subset()
+    takes the same row positions as the exact cube (for example from the
+    skill index).
+    """
+
+    is_exact = False
+
+    @classmethod
+    def from_frame(cls, sample):
+        """Cube over a sample_frame() table."""
+        cube = cls.build(sample, weights=sample['weight'].to_numpy())
+        cube.rows = sample['row'].to_numpy()
+        strata = sample.drop_duplicates(STRATA).set_index(STRATA)
+        cube.strata = strata[['stratum_population', 'stratum_sample']].rename(
+            columns={'stratum_population': 'population', 'stratum_sample': 'sample'})
+        return cube
+
+    @classmethod
+    def from_sample(cls, df, fraction=SAMPLE_FRACTION, min_rows=MIN_STRATUM_ROWS, seed=0):
+        return cls.from_frame(sample_frame(df, fraction, min_rows, seed))
+
+    def subset(self, rows):
+        """Estimated cube for the postings at the given dataset row positions."""
+        return JobCube.subset(self, np.flatnonzero(np.isin(self.rows, rows)))
+
+    def intervals(self, by, z=1.96, **filters):
+        """Estimated counts per value of a dimension with normal-approximation confidence bounds.
+
+        The variance is the stratified estimator's: for each stratum, the
+        population size squared times the sample proportion's variance
+        with the finite population correction, summed over strata.
+        """
+        cells = self.cells
+        for dimension, value in filters.items():
+            cells = cells[cells[dimension] == value]
+        by = [by] if isinstance(by, str) else list(by)
+
+        keys = by + [stratum for stratum in STRATA if stratum not in by]
+        counts = cells.groupby(keys, observed=True)['count'].sum()
+        counts = counts[counts > 0].reset_index()
+        sizes = self.strata.reindex(pd.MultiIndex.from_frame(counts[STRATA]))
+        population = sizes['population'].to_numpy(dtype=np.float64)
+        sample = sizes['sample'].to_numpy(dtype=np.float64)
+
+        # A stratum lying wholly inside one group has proportion 1, which rounding can push just past it
+        proportion = np.clip(counts['count'].to_numpy() / population, 0, 1)
+        correction = np.where(sample > 1, (1 - sample / population) / np.maximum(sample - 1, 1), 0)
+        counts['variance'] = population ** 2 * proportion * (1 - proportion) * correction
+
+        result = counts.groupby(by, observed=True)[['count', 'variance']].sum()
+        margin = z * np.sqrt(result.pop('variance'))
+        result['lower'] = (result['count'] - margin).clip(lower=0)
+        result['upper'] = result['count'] + margin
+        return result.sort_values('count', ascending=False, kind='stable')
+
+
+class ProgressiveCube:
+    """Answers cube queries from a stratified sample until the exact cube, built in the background, is ready.
+
+    The estimate comes from a pre-drawn sample_frame() table, so it is
+    available before the full dataset is read; load_frame, called on the
+    background thread, reads the full dataset for the exact cube, and
+    frame() hands that same frame to callers that need row-level data.
+    Methods mirror JobCube and go to whichever cube is current, so pages can
+    use either. is_exact tells callers which one answered.
+    """
+
+    def __init__(self, sample, load_frame, background=True):
+        start = time.perf_counter()
+        self.estimate = SampleCube.from_frame(sample)
+        self.sample_seconds = time.perf_counter() - start
+        self.df = None
+        self.error = None
+        self.exact = None
+        self.exact_seconds = None
+        self.loaded = threading.Event()
+        self.ready = threading.Event()
+
+        def build_exact():
+            start = time.perf_counter()
+            try:
+                self.df = load_frame()
+            except Exception as error:
+                self.error = error
+                self.loaded.set()
+                raise
+            self.loaded.set()
+            self.exact = JobCube.build(self.df)
+            self.exact_seconds = time.perf_counter() - start
+            self.ready.set()
+
+        if background:
+            self.refine_thread = threading.Thread(target=build_exact, name='exact-cube', daemon=True)
+            self.refine_thread.start()
+        else:
+            build_exact()
+
+    def frame(self):
+        """The full dataset, once the background thread has read it."""
+        self.loaded.wait()
+        if self.error is not None:
+            raise self.error
+        return self.df
+
+    @property
+    def is_exact(self):
+        return self.ready.is_set()
+
+    @property
+    def current(self):
+        return self.exact if self.ready.is_set() else self.estimate
+
+    @property
+    def sample_rows(self):
+        return len(self.estimate.rows)
+
+    def wait(self, timeout=None):
+        """Block until the exact cube is ready; returns whether it is."""
+        return self.ready.wait(timeout)
+
+    def query(self, by, **filters):
+        return self.current.query(by, **filters)
+
+    def counts(self, by, **filters):
+        return self.current.counts(by, **filters)
+
+    def salary_mean(self, **filters):
+        return self.current.salary_mean(**filters)
+
+    def shares(self, by, **filters):
+        return self.current.shares(by, **filters)
+
+    def subset(self, rows):
+        return self.current.subset(rows)
+
+    def intervals(self, by, z=1.96, **filters):
+        """Counts with confidence bounds; once exact, the bounds equal the counts."""
+        if not self.ready.is_set():
+            return self.estimate.intervals(by, z, **filters)
+        counts = self.exact.counts(by, **filters).to_frame('count')
+        counts['lower'] = counts['upper'] = counts['count']
+        return counts
@@ -0,0 +1,69 @@
+import io
+import threading
+from collections import OrderedDict
+
+
+class FigureCache:
+    """Size-bounded LRU cache of rendered figures: PNG bytes for matplotlib, JSON for plotly.
+
+    Keys are (page, parameters, dataset version) tuples, so a new dataset
+    version never serves a stale figure and old entries simply age out.
+    """
+
+    def __init__(self, max_bytes=64 * 2 ** 20):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get_or_render(self, key, render):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+
+        value = render()
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = value
+                self.size += len(value)
+            while self.size > self.max_bytes and len(self.entries) > 1:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+        return value
+
+    def matplotlib(self, key, render, dpi=100):
+        """PNG bytes of the matplotlib figure returned by render()."""
+        def render_png():
+            import matplotlib.pyplot as plt
+
+            fig = render()
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+            plt.close(fig)
+            return buffer.getvalue()
+
+        return self.get_or_render(key, render_png)
+
+    def plotly(self, key, render):
+        """Plotly figure rebuilt from the cached JSON of the figure returned by render()."""
+        import plotly.io as pio
+
+        return pio.from_json(self.get_or_render(key, lambda: render().to_json()))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'bytes': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,42 @@
+import pandas as pd
+
+SALARY_COLUMN = 'salary_year_avg'
+
+# Missing salaries are filled from the first grouping with a mean available
+IMPUTE_KEYS = [['job_title_short', 'job_country'], ['job_title_short']]
+
+OUTLIER_KEYS = ['job_title_short']
+IQR_MULTIPLIER = 1.5
+QUANTILES = (0.25, 0.75)
+
+
+def iqr_fences(q1, q3, k=IQR_MULTIPLIER):
+    return q1 - k * (q3 - q1), q3 + k * (q3 - q1)
+
+
+def salary_report(df, filled_by, keep, lower, upper, keys=OUTLIER_KEYS, impute_keys=IMPUTE_KEYS):
+    """Per-group counts of imputed and dropped rows, with the fences applied."""
+    report = pd.DataFrame({key: df[key] for key in keys})
+    for level, level_keys in enumerate(impute_keys):
+        report['imputed_by_' + '_'.join(level_keys)] = filled_by == level
+    report['dropped'] = ~keep
+    report['lower_fence'] = lower
+    report['upper_fence'] = upper
+
+    grouped = report.groupby(keys, observed=True)
+    result = grouped.sum(numeric_only=True).drop(columns=['lower_fence', 'upper_fence'])
+    result.insert(0, 'rows', grouped.size())
+    result[['lower_fence', 'upper_fence']] = grouped[['lower_fence', 'upper_fence']].first()
+    return result
+
+
+def combine_reports(reports):
+    """Sum per-chunk salary_report tables into one; the fences are the same in every chunk."""
+    reports = [report for report in reports if report is not None and len(report)]
+    if not reports:
+        return None
+    combined = pd.concat(reports)
+    grouped = combined.groupby(level=list(range(combined.index.nlevels)), observed=True)
+    result = grouped.sum(numeric_only=True).drop(columns=['lower_fence', 'upper_fence'])
+    result[['lower_fence', 'upper_fence']] = grouped[['lower_fence', 'upper_fence']].first()
+    return result
@@ -0,0 +1,210 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# job_skills holds Python list literals such as "['sql', 'power bi']", or 'Not specified'
+SKILL_PATTERN = re.compile(r"'([^']+)'")
+# Skill pairs listed together in fewer postings than this are too rare for a stable lift
+MIN_PAIR_POSTINGS = 10
+
+
+def parse_skill_list(skills_string):
+    """Parse one job_skills value into a list of lower-cased skill names."""
+    if not isinstance(skills_string, str):
+        return []
+    return [skill.strip().lower() for skill in SKILL_PATTERN.findall(skills_string)]
+
+
+def explode_skills(skills):
+    """Return (row ids, skill ids, skill names) for every (posting, skill) pair.
+
+    Only the distinct job_skills strings are parsed; rows are expanded from
+    them with array operations, so the cost of parsing depends on the number
+    of distinct skill lists rather than the number of postings.
+    """
+    codes, uniques = pd.factorize(skills, use_na_sentinel=True)
+
+    vocabulary = {}
+    lengths = np.zeros(len(uniques), dtype=np.int64)
+    flat = []
+    for i, value in enumerate(uniques):
+        parsed = dict.fromkeys(parse_skill_list(value))
+        lengths[i] = len(parsed)
+        flat.extend(vocabulary.setdefault(skill, len(vocabulary)) for skill in parsed)
+    flat = np.asarray(flat, dtype=np.int32)
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]) if len(lengths) else lengths
+
+    valid = codes >= 0
+    row_lengths = np.zeros(len(codes), dtype=np.int64)
+    row_lengths[valid] = lengths[codes[valid]]
+    row_starts = np.zeros(len(codes), dtype=np.int64)
+    row_starts[valid] = starts[codes[valid]]
+
+    row_ids = np.repeat(np.arange(len(codes), dtype=np.int32), row_lengths)
+    first_pair = np.cumsum(row_lengths) - row_lengths
+    positions = np.arange(len(row_ids)) - np.repeat(first_pair, row_lengths) + np.repeat(row_starts, row_lengths)
+    skill_ids = flat[positions] if len(positions) else np.zeros(0, dtype=np.int32)
+
+    names = np.array(list(vocabulary), dtype=object)
+    return row_ids, skill_ids, names
+
+
+class SkillIndex:
+    """Inverted index from each skill to the sorted row positions of the postings that list it."""
+
+    def __init__(self, names, offsets, rows, n_rows):
+        self.names = names
+        self.offsets = offsets
+        self.rows = rows
+        self.n_rows = n_rows
+        self.positions = {name: i for i, name in enumerate(names)}
+
+    @classmethod
+    def build(cls, skills):
+        row_ids, skill_ids, names = explode_skills(skills)
+        order = np.argsort(skill_ids, kind='stable')
+        counts = np.bincount(skill_ids, minlength=len(names))
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        return cls(names, offsets, row_ids[order], len(skills))
+
+    def skill_counts(self):
+        """Number of postings per skill, most common first."""
+        counts = pd.Series(np.diff(self.offsets), index=self.names, name='count')
+        return counts.sort_values(ascending=False, kind='stable')
+
+    def rows_for_skill(self, skill):
+        i = self.positions.get(skill)
+        if i is None:
+            return np.zeros(0, dtype=self.rows.dtype)
+        return self.rows[self.offsets[i]:self.offsets[i + 1]]
+
+    def lookup(self, skills, match='any'):
+        """Sorted row positions of postings listing any (or all) of the given skills."""
+        postings = sorted((self.rows_for_skill(skill) for skill in skills), key=len)
+        if not postings:
+            return np.zeros(0, dtype=self.rows.dtype)
+        if match == 'all':
+            result = postings[0]
+            for rows in postings[1:]:
+                result = np.intersect1d(result, rows, assume_unique=True)
+            return result
+        if match == 'any':
+            return np.unique(np.concatenate(postings))
+        raise ValueError(f"match must be 'any' or 'all', not {match!r}")
+
+    def mask(self, skills, match='any'):
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.lookup(skills, match)] = True
+        return mask
+
+
+def skill_title_counts(index, titles):
+    """Skill x job title posting counts as a compact integer matrix, built from the skill index."""
+    titles = pd.Categorical(titles)
+    n_skills, n_titles = len(index.names), len(titles.categories)
+
+    title_codes = titles.codes[index.rows]
+    skill_ids = np.repeat(np.arange(n_skills), np.diff(index.offsets))
+    keep = title_codes >= 0
+    counts = np.bincount(skill_ids[keep] * n_titles + title_codes[keep], minlength=n_skills * n_titles)
+
+    return pd.DataFrame(counts.reshape(n_skills, n_titles).astype(np.int32),
+                        index=pd.Index(index.names, name='Skill'),
+                        columns=pd.Index(titles.categories, name='job_title_short'))
+
+
+def skill_list_counts(df):
+    """Postings per distinct (job_skills, job_title_short) pair; far fewer rows than postings."""
+    counts = df.groupby(['job_skills', 'job_title_short'], observed=True, dropna=False).size()
+    return counts.rename('count').reset_index()
+
+
+class SkillCooccurrence:
+    """Skill x skill posting counts for each job title, held in one sparse matrix.
+
+    Row t * n_skills + i, column j counts the postings with title t that
+    list both skill i and skill j; the diagonal of each block is the
+    title's count per skill. It is built from weighted skill lists, such as
+    the distinct (job_skills, title) pairs from skill_list_counts, with one
+    explode_skills call and a single sparse product, so no Python work is
+    done per posting.
+    """
+
+    def __init__(self, names, titles, matrix, total, title_totals):
+        self.names = names
+        self.titles = titles
+        self.matrix = matrix
+        self.total = total
+        self.title_totals = title_totals
+        self.positions = {name: i for i, name in enumerate(names)}
+        self.title_positions = {title: t for t, title in enumerate(titles)}
+
+    @classmethod
+    def build(cls, skills, titles, weights=None):
+        from scipy import sparse
+
+        titles = pd.Categorical(titles)
+        weights = np.ones(len(titles), dtype=np.int64) if weights is None else np.asarray(weights, dtype=np.int64)
+        row_ids, skill_ids, names = explode_skills(skills)
+        n_skills, n_titles = len(names), len(titles.categories)
+
+        title_codes = titles.codes[row_ids].astype(np.int64)
+        keep = title_codes >= 0
+        row_ids, skill_ids, title_codes = row_ids[keep], skill_ids[keep], title_codes[keep]
+        shape = (len(titles), n_skills)
+        # (list x title-skill) incidence weighted by postings, times (list x skill) incidence
+        by_title = sparse.csr_matrix((weights[row_ids], (row_ids, title_codes * n_skills + skill_ids)),
+                                     shape=(len(titles), n_titles * n_skills))
+        lists = sparse.csr_matrix((np.ones(len(row_ids), dtype=np.int64), (row_ids, skill_ids)), shape=shape)
+        matrix = (by_title.T @ lists).tocsr()
+        # All titles together: the per-title blocks summed, folding block rows onto skill rows
+        blocks = matrix.tocoo()
+        total = sparse.csr_matrix((blocks.data, (blocks.row % n_skills, blocks.col)), shape=(n_skills, n_skills))
+
+        has_title = titles.codes >= 0
+        title_totals = np.bincount(titles.codes[has_title], weights=weights[has_title], minlength=n_titles)
+        return cls(names, list(titles.categories), matrix, total, title_totals.astype(np.int64))
+
+    def block(self, job_title=None):
+        """(skill x skill counts, number of postings) for one job title, or for all titles."""
+        if job_title is None:
+            return self.total, int(self.title_totals.sum())
+        t = self.title_positions.get(job_title)
+        if t is None:
+            return self.total[:0], 0
+        n_skills = len(self.names)
+        return self.matrix[t * n_skills:(t + 1) * n_skills], int(self.title_totals[t])
+
+    def related(self, skills, job_title=None, top=10, min_count=MIN_PAIR_POSTINGS):
+        """Skills most often listed alongside the given ones, by lift over independent occurrence.
+
+        For each selected skill i and candidate j, lift is
+        P(i and j) / (P(i) P(j)) among the title's postings and PMI its log2.
+        Only candidates listed together with every selected skill in at least
+        min_count postings are scored, and scores are averaged over the
+        selected skills. share is the average fraction of postings listing a
+        selected skill that also list the candidate.
+        """
+        counts, n_postings = self.block(job_title)
+        selected = [self.positions[skill] for skill in dict.fromkeys(skills) if skill in self.positions]
+        columns = ['share', 'lift', 'pmi', 'together', 'postings']
+        if not selected or not n_postings or counts.shape[0] == 0:
+            return pd.DataFrame(columns=columns, index=pd.Index([], name='skill'))
+
+        skill_totals = counts.diagonal().astype(np.float64)
+        pairs = counts[selected].toarray().astype(np.float64)
+        candidates = (pairs >= min_count).all(axis=0)
+        candidates[selected] = False
+        pairs = pairs[:, candidates]
+
+        selected_totals = skill_totals[selected][:, None]
+        pmi = np.log2(pairs * n_postings / (selected_totals * skill_totals[candidates])).mean(axis=0)
+        related = pd.DataFrame({
+            'share': (pairs / selected_totals).mean(axis=0),
+            'lift': 2 ** pmi,
+            'pmi': pmi,
+            'together': pairs.min(axis=0).astype(np.int64),
+            'postings': skill_totals[candidates].astype(np.int64),
+        }, index=pd.Index(self.names[candidates], name='skill'))
+        return related.sort_values(['pmi', 'share'], ascending=False, kind='stable').head(top)
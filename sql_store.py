@@ -0,0 +1,111 @@
+import duckdb
+import numpy as np
+import pandas as pd
+
+# The job_skills strings look like "['python', 'sql']"; same pattern and normalisation as skills.parse_skill_list
+SKILLS_EXPRESSION = (r"list_distinct(list_transform(regexp_extract_all(job_skills, '''([^'']+)''', 1), "
+                     r"skill -> trim(lower(skill))))")
+
+
+class SqlStore:
+    """Dashboard queries answered by an embedded DuckDB over the dataset's Parquet snapshot.
+
+    Offers the JobCube methods the pages use (query, counts, salary_mean,
+    shares, subset) plus SkillIndex's skill_counts and lookup, so a page can
+    run on either backend. Only the columns a query touches are read, and
+    filters are pushed down into the Parquet scan. The one table kept in
+    memory holds each distinct job_skills string with its parsed skill list,
+    so skill queries never re-parse the strings of every posting.
+    """
+
+    is_exact = True
+
+    def __init__(self, path, connection=None, conditions=(), parameters=()):
+        self.path = path
+        if connection is None:
+            connection = duckdb.connect()
+            # One snapshot file, or the partition files of a posting store
+            paths = [path] if isinstance(path, str) else path
+            quoted_paths = ', '.join("'" + p.replace("'", "''") + "'" for p in paths)
+            connection.execute(f"CREATE VIEW postings AS SELECT * FROM read_parquet([{quoted_paths}])")
+            # Parse each distinct skill list once; queries join or semi-join on the job_skills string
+            connection.execute(f"CREATE TABLE skill_lists AS SELECT job_skills, {SKILLS_EXPRESSION} AS skills "
+                               "FROM (SELECT DISTINCT job_skills FROM postings WHERE job_skills IS NOT NULL)")
+        self.connection = connection
+        self.conditions = tuple(conditions)
+        self.parameters = tuple(parameters)
+
+    def filtered(self, condition, *parameters):
+        """Store restricted by one more SQL condition, sharing this store's connection."""
+        return SqlStore(self.path, self.connection, self.conditions + (condition,), self.parameters + parameters)
+
+    def between(self, start=None, end=None):
+        """Postings whose posting day falls in [start, end]; either bound may be None."""
+        store = self
+        if start is not None:
+            store = store.filtered('date_only >= ?', pd.Timestamp(start).to_pydatetime())
+        if end is not None:
+            store = store.filtered('date_only <= ?', pd.Timestamp(end).to_pydatetime())
+        return store
+
+    def lookup(self, skills, match='any'):
+        """Skill selection for subset(), in place of SkillIndex.lookup's row positions."""
+        if match not in ('any', 'all'):
+            raise ValueError(f"match must be 'any' or 'all', not {match!r}")
+        return match, list(skills)
+
+    def subset(self, selection):
+        match, skills = selection
+        function = 'list_has_all' if match == 'all' else 'list_has_any'
+        return self.filtered(f'job_skills IN (SELECT job_skills FROM skill_lists WHERE {function}(skills, ?::VARCHAR[]))',
+                             skills)
+
+    def execute(self, sql, filters):
+        conditions = list(self.conditions)
+        parameters = list(self.parameters)
+        for dimension, value in filters.items():
+            conditions.append(f'"{dimension}" = ?')
+            parameters.append(value)
+        where = ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+        # A cursor per query, since one DuckDB connection must not be shared between threads
+        return self.connection.cursor().execute(sql.format(where=where), parameters).df()
+
+    def query(self, by, **filters):
+        """Counts and mean salary grouped by one or more dimensions, after equality filters on others."""
+        by = [by] if isinstance(by, str) else list(by)
+        columns = ', '.join(f'"{column}"' for column in by)
+        result = self.execute(
+            f'SELECT {columns}, count(*) AS count, sum(salary_year_avg) AS salary_sum, '
+            f'count(salary_year_avg) AS salary_count FROM postings{{where}} GROUP BY {columns}', filters)
+        result = result.set_index(by[0] if len(by) == 1 else by)
+        result['salary_mean'] = result['salary_sum'] / result['salary_count'].where(result['salary_count'] > 0)
+        return result
+
+    def counts(self, by, **filters):
+        """Posting counts per value of a dimension, largest first."""
+        counts = self.query(by, **filters)['count']
+        return counts.sort_index(kind='stable').sort_values(ascending=False, kind='stable')
+
+    def salary_mean(self, **filters):
+        result = self.execute('SELECT avg(salary_year_avg) AS salary_mean FROM postings{where}', filters)
+        salary_mean = result['salary_mean'].iloc[0]
+        return np.nan if pd.isna(salary_mean) else float(salary_mean)
+
+    def shares(self, by, **filters):
+        """Percentage of postings per value of a dimension."""
+        counts = self.counts(by, **filters)
+        return counts / counts.sum() * 100
+
+    def skill_counts(self, **filters):
+        """Number of postings per skill, most common first."""
+        result = self.execute(
+            'SELECT skill, sum(list_count)::BIGINT AS count FROM ('
+            'SELECT unnest(skills) AS skill, list_count FROM skill_lists JOIN ('
+            'SELECT job_skills, count(*) AS list_count FROM postings{where} GROUP BY job_skills) USING (job_skills)'
+            ') GROUP BY skill ORDER BY count DESC, skill', filters)
+        return result.set_index('skill')['count'].rename_axis(None)
+
+    def skill_list_counts(self, **filters):
+        """Postings per distinct (job_skills, job_title_short) pair, as skills.skill_list_counts."""
+        return self.execute('SELECT job_skills, job_title_short, count(*) AS count FROM postings{where} '
+                            'GROUP BY job_skills, job_title_short', filters)
@@ -0,0 +1,93 @@
+import argparse
+import json
+import re
+import subprocess
+import sys
+
+# Imported by individual pages rather than at app start
+PAGE_MODULES = [
+    'plotly.express',
+    'plotly.subplots',
+    'matplotlib.pyplot',
+    'scipy.stats',
+    'streamlit_folium',
+    'folium.plugins',
+    'wordcloud',
+    'prophet.serialize',
+    'duckdb',
+]
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def import_times(statement):
+    """Per-module self and cumulative import times (seconds) of a statement run in a fresh interpreter."""
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                               capture_output=True, text=True, check=True)
+    modules = []
+    for line in completed.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append({
+                'module': name,
+                'depth': len(indent) // 2,
+                'self_seconds': int(self_us) / 1e6,
+                'cumulative_seconds': int(cumulative_us) / 1e6,
+            })
+    return modules
+
+
+def startup_report(module='app', page_modules=PAGE_MODULES):
+    """Cold import time of a module, the imports it triggers directly, and the extra cost of each page module."""
+    modules = import_times(f'import {module}')
+    app_entry = next(m for m in reversed(modules) if m['module'] == module)
+    # -X importtime lists a module after everything it imported, one indent level deeper
+    direct = [m for m in modules if m['depth'] == app_entry['depth'] + 1]
+
+    # Top-level packages by their own import time, summed over all submodules
+    packages = {}
+    for m in modules:
+        package = m['module'].split('.')[0]
+        packages[package] = packages.get(package, 0.0) + m['self_seconds']
+
+    pages = {}
+    for page_module in page_modules:
+        try:
+            extra = import_times(f'import {module}; import {page_module}')
+        except subprocess.CalledProcessError:
+            pages[page_module] = None
+            continue
+        entry = next((m for m in reversed(extra) if m['module'] == page_module), None)
+        pages[page_module] = entry['cumulative_seconds'] if entry else 0.0
+
+    return {
+        'module': module,
+        'total_seconds': app_entry['cumulative_seconds'],
+        'direct_imports': sorted(direct, key=lambda m: -m['cumulative_seconds']),
+        'packages': dict(sorted(packages.items(), key=lambda item: -item[1])),
+        'page_modules': pages,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Report where the import time of app.py goes on a cold start.')
+    parser.add_argument('module', nargs='?', default='app')
+    parser.add_argument('--top', type=int, default=15, help='packages to list')
+    parser.add_argument('--json', help='also write the report to this path')
+    args = parser.parse_args()
+
+    report = startup_report(args.module)
+    print(f"import {report['module']}: {report['total_seconds'] * 1000:.0f} ms\n")
+    print('Direct imports (cumulative):')
+    for m in report['direct_imports'][:args.top]:
+        print(f"  {m['module']:<32} {m['cumulative_seconds'] * 1000:8.1f} ms")
+    print('\nPackages (own time, all submodules):')
+    for package, seconds in list(report['packages'].items())[:args.top]:
+        print(f'  {package:<32} {seconds * 1000:8.1f} ms')
+    print('\nDeferred page imports (extra time on first use):')
+    for page_module, seconds in report['page_modules'].items():
+        print(f"  {page_module:<32} {'not installed' if seconds is None else f'{seconds * 1000:8.1f} ms'}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
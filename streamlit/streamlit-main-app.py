@@ -101,8 +101,11 @@ def job_history_page(df):
         st.subheader("Job Locations Analysis")
         
         st.write("Job Locations Heatmap")
-        heat_data = [[row['latitude'], row['longitude']] for index, row in df.iterrows()]
-        m = folium.Map(location=[df['latitude'].mean(), df['longitude'].mean()], zoom_start=4)
+        # Bin postings into 1-degree cells so the map gets one weighted point per cell
+        located = df[['latitude', 'longitude']].dropna()
+        cells = (np.floor(located) + 0.5).value_counts()
+        heat_data = [[lat, lon, count / cells.iloc[0]] for (lat, lon), count in cells.head(2000).items()]
+        m = folium.Map(location=[located['latitude'].mean(), located['longitude'].mean()], zoom_start=4)
         HeatMap(heat_data).add_to(m)
         folium_static(m)
 
@@ -0,0 +1,128 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Shares of the cleaned dataset's job titles, after the Senior titles are merged
+TITLE_WEIGHTS = {
+    'Data Analyst': 0.30,
+    'Data Engineer': 0.27,
+    'Data Scientist': 0.25,
+    'Business Analyst': 0.06,
+    'Software Engineer': 0.06,
+    'Machine Learning Engineer': 0.04,
+    'Cloud Engineer': 0.02,
+}
+TITLE_SALARY = {
+    'Data Analyst': 94_000,
+    'Data Engineer': 130_000,
+    'Data Scientist': 135_000,
+    'Business Analyst': 92_000,
+    'Software Engineer': 125_000,
+    'Machine Learning Engineer': 145_000,
+    'Cloud Engineer': 120_000,
+}
+SCHEDULE_WEIGHTS = {'Full-time': 0.88, 'Contract': 0.05, 'Part-time': 0.03, 'Internship': 0.02, 'Temp work': 0.01, 'Others': 0.01}
+SKILLS = [
+    'sql', 'python', 'aws', 'azure', 'r', 'tableau', 'excel', 'spark', 'power bi', 'java', 'snowflake', 'sas',
+    'hadoop', 'gcp', 'databricks', 'scala', 'kafka', 'airflow', 'docker', 'kubernetes', 'git', 'linux', 'looker',
+    'pandas', 'pytorch', 'tensorflow', 'go', 'javascript', 'oracle', 'mongodb', 'postgresql', 'bigquery',
+    'redshift', 'numpy', 'scikit-learn', 'jira', 'sheets', 'word', 'powerpoint', 'flow', 'c++', 'c#', 'bash',
+    'terraform', 'jenkins', 'vba', 'qlik', 'alteryx', 'matlab', 'nosql',
+]
+N_COUNTRIES = 160
+N_COMPANIES = 140_000
+N_SOURCES = 7_000
+N_SKILL_LISTS = 20_000
+DATE_START = '2023-01-01'
+DATE_DAYS = 365
+
+
+def zipf_weights(n, exponent=1.1):
+    weights = 1 / np.arange(1, n + 1) ** exponent
+    return weights / weights.sum()
+
+
+def skill_lists(rng, n_lists=N_SKILL_LISTS):
+    """Distinct skill list strings in the dataset's "['a', 'b']" format, with popular skills first."""
+    skill_weights = zipf_weights(len(SKILLS), 0.9)
+    lists = set()
+    while len(lists) < n_lists:
+        size = rng.integers(1, 9)
+        chosen = rng.choice(len(SKILLS), size=size, replace=False, p=skill_weights)
+        lists.add(str([SKILLS[i] for i in chosen]))
+    return np.array(sorted(lists), dtype=object)
+
+
+def generate(n_rows, seed=0):
+    """Synthetic postings with the cleaned dataset's columns, dtypes and rough distributions.
+
+    Countries, companies, job sources and skill lists follow Zipf-like
+    frequencies over many distinct values, so categorical encodings, group
+    counts and skill parsing see realistic cardinalities.
+    """
+    rng = np.random.default_rng(seed)
+
+    titles = np.array(list(TITLE_WEIGHTS), dtype=object)
+    title_codes = rng.choice(len(titles), size=n_rows, p=list(TITLE_WEIGHTS.values()))
+
+    countries = np.array([f'Country {i:03d}' for i in range(N_COUNTRIES)], dtype=object)
+    countries[:5] = ['United States', 'India', 'United Kingdom', 'France', 'Germany']
+    country_codes = rng.choice(N_COUNTRIES, size=n_rows, p=zipf_weights(N_COUNTRIES))
+    country_latitude = rng.uniform(-50, 65, N_COUNTRIES)
+    country_longitude = rng.uniform(-170, 175, N_COUNTRIES)
+
+    sources = np.array(['via LinkedIn', 'via Indeed', 'via BeBee', 'via Trabajo.org', 'via ZipRecruiter']
+                       + [f'via Job Board {i}' for i in range(N_SOURCES - 5)], dtype=object)
+    companies = np.array(['Not specified'] + [f'Company {i}' for i in range(N_COMPANIES - 1)], dtype=object)
+    skills = np.append(skill_lists(rng), 'Not specified')
+    skill_weights = zipf_weights(len(skills), 0.8)
+
+    salary_means = np.array([TITLE_SALARY[title] for title in titles])
+    salary = rng.lognormal(np.log(salary_means[title_codes]), 0.25)
+
+    seconds = rng.integers(0, DATE_DAYS * 86_400, size=n_rows)
+    posted = pd.Timestamp(DATE_START) + pd.to_timedelta(np.sort(seconds), unit='s')
+
+    return pd.DataFrame({
+        'job_title_short': titles[title_codes],
+        'job_title': np.where(rng.random(n_rows) < 0.3, 'Senior ', '').astype(object) + titles[title_codes],
+        'job_location': countries[country_codes],
+        'job_via': sources[rng.choice(N_SOURCES, size=n_rows, p=zipf_weights(N_SOURCES, 1.3))],
+        'job_schedule_type': rng.choice(list(SCHEDULE_WEIGHTS), size=n_rows, p=list(SCHEDULE_WEIGHTS.values())),
+        'job_work_from_home': rng.random(n_rows) < 0.09,
+        'search_location': countries[country_codes],
+        'job_posted_date': posted,
+        'job_no_degree_mention': rng.random(n_rows) < 0.28,
+        'job_health_insurance': rng.random(n_rows) < 0.12,
+        'job_country': countries[country_codes],
+        'salary_year_avg': salary,
+        'company_name': companies[rng.choice(N_COMPANIES, size=n_rows, p=zipf_weights(N_COMPANIES, 0.9))],
+        'job_skills': skills[rng.choice(len(skills), size=n_rows, p=skill_weights)],
+        'job_type_skills': 'Not specified',
+        'num_jobs': 1,
+        'latitude': country_latitude[country_codes],
+        'longitude': country_longitude[country_codes],
+    })
+
+
+def synthetic_csv(n_rows, data_dir, seed=0):
+    """Path of a generated CSV with n_rows postings, written on first use."""
+    path = os.path.join(data_dir, f'synthetic-{n_rows}-{seed}.csv')
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        tmp_path = path + '.tmp'
+        generate(n_rows, seed).to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write a synthetic cleaned job postings CSV.')
+    parser.add_argument('rows', type=int)
+    parser.add_argument('output')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    generate(args.rows, args.seed).to_csv(args.output, index=False)
@@ -0,0 +1,27 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The modules live at the repository root and are imported as top-level modules, as the app does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_store import APP_SCHEMA, apply_schema  # noqa: E402
+from synthetic import generate  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def postings_frame():
+    """Small cleaned frame in the app's schema, with missing salaries and skill lists."""
+    df = generate(3_000, seed=7)
+    rng = np.random.default_rng(8)
+    df.loc[rng.random(len(df)) < 0.4, 'salary_year_avg'] = np.nan
+    df.loc[rng.random(len(df)) < 0.05, 'job_skills'] = np.nan
+    df['date_only'] = df['job_posted_date'].dt.normalize()
+    return apply_schema(df[list(APP_SCHEMA)].copy(), APP_SCHEMA)
+
+
+@pytest.fixture
+def postings(postings_frame):
+    return postings_frame.copy()
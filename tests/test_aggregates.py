@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import JobCube, company_stats
+
+
+@pytest.fixture
+def cube(postings):
+    return JobCube.build(postings)
+
+
+@pytest.mark.parametrize('by', ['job_title_short', 'job_country', 'job_schedule_type', 'job_work_from_home'])
+def test_counts_and_shares_match_value_counts(postings, cube, by):
+    expected = postings[by].value_counts()
+    expected = expected[expected > 0]
+    assert cube.counts(by).to_dict() == expected.to_dict()
+    assert cube.counts(by).is_monotonic_decreasing
+    shares = cube.shares(by)
+    assert shares.to_dict() == pytest.approx((expected / len(postings) * 100).to_dict())
+
+
+def test_filtered_queries_match_a_groupby(postings, cube):
+    country = postings['job_country'].value_counts().index[0]
+    rows = postings[postings['job_country'] == country]
+    expected = rows['job_title_short'].value_counts()
+    assert cube.counts('job_title_short', job_country=country).to_dict() == expected[expected > 0].to_dict()
+
+    grouped = postings.groupby(['job_title_short', 'job_schedule_type'], observed=True)['salary_year_avg']
+    result = cube.query(['job_title_short', 'job_schedule_type'])
+    assert result['count'].to_dict() == grouped.size().to_dict()
+    np.testing.assert_allclose(result['salary_mean'].to_numpy(), grouped.mean().reindex(result.index).to_numpy(),
+                               rtol=1e-6)
+
+
+def test_salary_mean_matches_the_column_mean(postings, cube):
+    assert cube.salary_mean() == pytest.approx(postings['salary_year_avg'].mean(), rel=1e-6)
+    title = postings['job_title_short'].iloc[0]
+    rows = postings[(postings['job_title_short'] == title) & postings['job_work_from_home']]
+    assert cube.salary_mean(job_title_short=title, job_work_from_home=True) == \
+        pytest.approx(rows['salary_year_avg'].mean(), rel=1e-6)
+    assert np.isnan(cube.salary_mean(job_country='Nowhere'))
+
+
+def test_subset_matches_a_cube_of_the_rows(postings, cube):
+    rows = np.flatnonzero(np.random.default_rng(9).random(len(postings)) < 0.3)
+    subset = cube.subset(rows)
+    expected = postings.iloc[rows]
+    assert subset.counts('job_country').to_dict() == expected['job_country'].value_counts().loc[lambda c: c > 0].to_dict()
+    assert subset.salary_mean() == pytest.approx(expected['salary_year_avg'].mean(), rel=1e-6)
+
+
+def test_cells_cube_cannot_be_subset(cube):
+    cells = JobCube.from_cells(cube.cells)
+    assert cells.counts('job_title_short').to_dict() == cube.counts('job_title_short').to_dict()
+    with pytest.raises(ValueError):
+        cells.subset(np.arange(3))
+
+
+def test_company_stats_match_a_groupby(postings):
+    stats = company_stats(postings)
+    expected = postings.groupby('company_name', observed=True).size()
+    assert stats['count'].to_dict() == expected[expected > 0].to_dict()
+    dominant = postings.groupby('company_name', observed=True)['job_country'].agg(lambda c: c.astype(str).mode().iloc[0])
+    assert stats['job_country'].astype(str).to_dict() == dominant.reindex(stats.index).to_dict()
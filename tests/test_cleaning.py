@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cleaning import JOB_TITLE_MAPPING, clean
+from salary import iqr_fences
+from synthetic import generate
+
+
+@pytest.fixture
+def raw_csv(tmp_path):
+    raw = generate(12_000, seed=11).drop(columns=['num_jobs', 'latitude', 'longitude'])
+    rng = np.random.default_rng(12)
+    raw.loc[rng.random(len(raw)) < 0.5, 'salary_year_avg'] = np.nan
+    raw.loc[rng.random(len(raw)) < 0.02, 'job_country'] = np.nan
+    raw['salary_rate'] = 'year'
+    raw['salary_hour_avg'] = np.nan
+    raw['job_posted_date'] = raw['job_posted_date'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    path = tmp_path / 'raw.csv'
+    raw.to_csv(path, index=False)
+    return raw, str(path)
+
+
+@pytest.mark.parametrize('quantiles', [(0.25, 0.75), (0.1, 0.9)])
+def test_salary_report_matches_the_in_memory_stage(raw_csv, tmp_path, quantiles):
+    raw, path = raw_csv
+    result = clean(path, str(tmp_path / 'out.parquet'), chunksize=2_500,
+                   impute_keys=[['job_title_short', 'job_country'], ['job_title_short']], k=2.0, quantiles=quantiles)
+    report = pd.read_csv(result['salary_report'], index_col='job_title_short')
+
+    df = raw.assign(job_title_short=raw['job_title_short'].replace(JOB_TITLE_MAPPING))
+    salary = df['salary_year_avg']
+    for keys in [['job_title_short', 'job_country'], ['job_title_short']]:
+        salary = salary.fillna(salary.groupby([df[key] for key in keys]).transform('mean'))
+    kept = df.assign(salary_year_avg=salary)[df['job_country'].notna()]
+    grouped = kept.groupby('job_title_short')['salary_year_avg']
+    lower, upper = iqr_fences(grouped.quantile(quantiles[0]), grouped.quantile(quantiles[1]), 2.0)
+
+    assert report['rows'].sum() == kept.shape[0]
+    assert (report['rows'] - report['dropped']).sum() == result['rows_out']
+    imputed = report['imputed_by_job_title_short_job_country'] + report['imputed_by_job_title_short']
+    assert imputed.sum() == df.loc[kept.index, 'salary_year_avg'].isna().sum()
+    assert report['lower_fence'].sort_index().to_numpy() == pytest.approx(lower.sort_index().to_numpy())
+    assert report['upper_fence'].sort_index().to_numpy() == pytest.approx(upper.sort_index().to_numpy())
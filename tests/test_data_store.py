@@ -0,0 +1,104 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_store import (ReadOnlyFrame, ensure_snapshot, file_fingerprint, freeze, load_dataset, load_sample, sample_path,
+                        snapshot_path)
+from synthetic import generate
+
+
+@pytest.fixture
+def shared():
+    df = pd.DataFrame({
+        'job_title_short': pd.Categorical(['Data Analyst', 'Data Engineer', 'Data Analyst']),
+        'salary_year_avg': np.array([90_000, 130_000, np.nan], dtype=np.float32),
+        'job_work_from_home': [True, False, False],
+    })
+    return freeze(df)
+
+
+MUTATIONS = {
+    'setitem': lambda f: f.__setitem__('new', 1),
+    'delitem': lambda f: f.__delitem__('salary_year_avg'),
+    'insert': lambda f: f.insert(0, 'new', 1),
+    'pop': lambda f: f.pop('salary_year_avg'),
+    'sort_values': lambda f: f.sort_values('salary_year_avg', inplace=True),
+    'drop': lambda f: f.drop(columns=['salary_year_avg'], inplace=True),
+    'rename': lambda f: f.rename(columns={'salary_year_avg': 'salary'}, inplace=True),
+    'rename_index': lambda f: f.rename(index={0: 10}, inplace=True),
+    'dropna': lambda f: f.dropna(inplace=True),
+    'drop_duplicates': lambda f: f.drop_duplicates(inplace=True),
+    'reset_index': lambda f: f.reset_index(drop=True, inplace=True),
+    'set_index': lambda f: f.set_index('job_title_short', inplace=True),
+    'rename_axis': lambda f: f.rename_axis('posting', inplace=True),
+    'assign_columns': lambda f: setattr(f, 'columns', ['a', 'b', 'c']),
+    'assign_index': lambda f: setattr(f, 'index', [5, 6, 7]),
+}
+
+
+@pytest.mark.parametrize('name', MUTATIONS)
+def test_structural_changes_raise(shared, name):
+    before = shared.copy()
+    with pytest.raises(TypeError):
+        MUTATIONS[name](shared)
+    pd.testing.assert_frame_equal(pd.DataFrame(shared), before)
+
+
+def test_value_writes_raise(shared):
+    with pytest.raises(ValueError):
+        shared.loc[0, 'salary_year_avg'] = 1.0
+    with pytest.raises(ValueError):
+        shared['salary_year_avg'].to_numpy()[0] = 1.0
+
+
+def test_derived_frames_are_writable(shared):
+    assert isinstance(shared, ReadOnlyFrame)
+    derived = shared.sort_values('salary_year_avg')
+    assert type(derived) is pd.DataFrame
+    derived['new'] = 1
+    derived.drop(columns=['new'], inplace=True)
+    copy = shared.copy()
+    copy.rename(columns={'salary_year_avg': 'salary'}, inplace=True)
+    assert 'salary' in copy.columns and 'salary_year_avg' in shared.columns
+
+
+def test_snapshot_cleanup_keeps_other_sources(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    frame = generate(2, seed=1)
+    paths = [tmp_path / 'a' / 'data.csv', tmp_path / 'a' / 'data-2024.csv', tmp_path / 'b' / 'data.csv']
+    for i, path in enumerate(paths):
+        path.parent.mkdir(exist_ok=True)
+        frame.assign(num_jobs=i).to_csv(path, index=False)
+    snapshots = [ensure_snapshot(str(path)) for path in paths]
+    assert len(set(snapshots)) == 3
+
+    # A new version of a/data.csv replaces only its own snapshot
+    frame.assign(num_jobs=9).to_csv(paths[0], index=False)
+    os.utime(paths[0], ns=(0, 10 ** 9))
+    replaced = ensure_snapshot(str(paths[0]))
+    assert replaced != snapshots[0] and not os.path.exists(snapshots[0])
+    assert all(os.path.exists(snapshot) for snapshot in snapshots[1:])
+    assert load_dataset(str(paths[0]))['num_jobs'].tolist() == [9, 9]
+    assert load_dataset(str(paths[2]))['num_jobs'].tolist() == [2, 2]
+
+
+def test_only_progressive_loads_draw_a_sample(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    paths = [tmp_path / 'plain.csv', tmp_path / 'progressive.csv']
+    for path in paths:
+        generate(500, seed=3).to_csv(path, index=False)
+
+    ensure_snapshot(str(paths[0]))
+    load_dataset(str(paths[0]))
+    assert not os.path.exists(sample_path(str(paths[0]), file_fingerprint(str(paths[0]))))
+
+    sample = load_sample(str(paths[1]))
+    fingerprint = file_fingerprint(str(paths[1]))
+    assert os.path.exists(snapshot_path(str(paths[1]), fingerprint))
+    assert os.path.exists(sample_path(str(paths[1]), fingerprint))
+    assert sample['weight'].sum() == pytest.approx(500)
+
+    # A snapshot built without a sample gets one drawn from it on first use
+    assert load_sample(str(paths[0]))['weight'].sum() == pytest.approx(500)
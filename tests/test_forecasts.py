@@ -0,0 +1,24 @@
+import pandas as pd
+
+import forecasts
+from forecasts import FORECAST_COLUMNS, cached_forecast_table
+
+
+class ConstantModel:
+    history = pd.DataFrame({'ds': pd.to_datetime(['2024-11-01', '2024-12-01'])})
+
+    def predict(self, future):
+        return future.assign(**{column: 1.0 for column in FORECAST_COLUMNS})
+
+
+def test_new_version_replaces_the_cached_forecast(tmp_path, monkeypatch):
+    monkeypatch.setattr(forecasts, 'CACHE_DIR', str(tmp_path))
+    for job_type in ['Data Engineer', 'Data Engineer-Lead']:
+        cached_forecast_table(job_type, 'aaaa', ConstantModel)
+    cached_forecast_table('Data Engineer', 'bbbb', ConstantModel)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        'forecast-Data Engineer-Lead-aaaa.parquet',
+        'forecast-Data Engineer-bbbb.parquet',
+    ]
+    assert cached_forecast_table('Data Engineer', 'bbbb', lambda: None)['yhat'].eq(1.0).all()
@@ -0,0 +1,28 @@
+import threading
+
+from metrics import Metrics
+
+
+def test_concurrent_textfile_writes(tmp_path):
+    metrics = Metrics()
+    with metrics.timer('page', 'Job Trends'):
+        pass
+    path = tmp_path / 'data_jobs.prom'
+    errors = []
+
+    def write():
+        try:
+            for _ in range(50):
+                metrics.write_textfile(str(path))
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=write) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert path.read_text() == metrics.prometheus_text()
+    assert [p.name for p in tmp_path.iterdir()] == ['data_jobs.prom']
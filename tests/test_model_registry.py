@@ -0,0 +1,59 @@
+import json
+import logging
+import os
+import shutil
+
+import pytest
+
+from model_registry import MANIFEST_NAME, MODEL_DIR, MODEL_SUFFIX, ModelRegistry, checksum, write_manifest
+
+pytest.importorskip('prophet')
+
+
+def test_checksum_mismatch_skips_the_model_and_warm_up_continues(tmp_path, caplog):
+    with open(os.path.join(MODEL_DIR, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    job_types = sorted(manifest)[:2]
+    for job_type in job_types:
+        shutil.copy(os.path.join(MODEL_DIR, manifest[job_type]['file']), tmp_path)
+    with open(tmp_path / MANIFEST_NAME, 'w') as f:
+        json.dump({job_type: manifest[job_type] for job_type in job_types}, f)
+    with open(tmp_path / f'{job_types[0]}{MODEL_SUFFIX}.json', 'a') as f:
+        f.write(' ')
+
+    registry = ModelRegistry(str(tmp_path))
+    with caplog.at_level(logging.WARNING, logger='model_registry'):
+        registry.warm_up(background=False)
+
+    assert registry.get(job_types[0]) is None
+    assert registry.stats[job_types[0]]['error'] == 'checksum mismatch'
+    assert 'Checksum mismatch' in caplog.text
+    assert registry.get(job_types[1]) is not None
+    assert registry.stats[job_types[1]]['load_seconds'] > 0
+
+
+def test_a_rewritten_manifest_replaces_loaded_models(tmp_path):
+    with open(os.path.join(MODEL_DIR, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    job_types = sorted(manifest)[:2]
+    for job_type in job_types:
+        shutil.copy(os.path.join(MODEL_DIR, manifest[job_type]['file']), tmp_path)
+    manifest = {job_type: manifest[job_type] for job_type in job_types}
+    write_manifest(manifest, str(tmp_path))
+
+    registry = ModelRegistry(str(tmp_path))
+    version = registry.version(job_types[0])
+    model = registry.get(job_types[0])
+    other = registry.get(job_types[1])
+
+    # A retrain rewrites the model file and its manifest entry while the app keeps running
+    path = tmp_path / manifest[job_types[0]]['file']
+    shutil.copy(tmp_path / manifest[job_types[1]]['file'], path)
+    manifest[job_types[0]] = dict(manifest[job_types[0]], sha256=checksum(str(path)), version=2)
+    write_manifest(manifest, str(tmp_path))
+    stat = os.stat(tmp_path / MANIFEST_NAME)
+    os.utime(tmp_path / MANIFEST_NAME, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert registry.version(job_types[0]) != version
+    assert registry.get(job_types[0]) is not model
+    assert registry.get(job_types[1]) is other
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import JobCube
+from posting_store import PostingStore
+from skills import SkillIndex, skill_title_counts
+from synthetic import generate
+
+
+@pytest.fixture
+def raw_batches(tmp_path, monkeypatch):
+    # file_fingerprint keeps its sidecars in the working directory's cache/
+    monkeypatch.chdir(tmp_path)
+    raw = generate(20_000, seed=5).drop(columns=['num_jobs', 'latitude', 'longitude'])
+    rng = np.random.default_rng(6)
+    raw.loc[rng.random(len(raw)) < 0.5, 'salary_year_avg'] = np.nan
+    raw['salary_rate'] = 'year'
+    raw['salary_hour_avg'] = np.nan
+    raw['job_posted_date'] = raw['job_posted_date'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    paths = []
+    for i, rows in enumerate([slice(0, 14_000), slice(14_000, 17_000), slice(17_000, None)]):
+        paths.append(str(tmp_path / f'batch{i}.csv'))
+        raw.iloc[rows].to_csv(paths[-1], index=False)
+    return paths
+
+
+def test_appended_aggregates_match_a_rebuild(raw_batches, tmp_path):
+    store, _ = PostingStore.create(str(tmp_path / 'store'), raw_batches[0], chunksize=5_000)
+    version = store.version
+    assert store.append(raw_batches[1]) is not None
+    assert store.append(raw_batches[2]) is not None
+    assert store.append(raw_batches[1]) is None
+    assert store.version != version
+
+    df = store.load()
+    df['date_only'] = df['job_posted_date'].dt.normalize()
+    exact = JobCube.build(df)
+    cells = JobCube.from_cells(store.cells())
+    for by in ['job_title_short', 'job_country', 'job_schedule_type']:
+        assert cells.counts(by).to_dict() == exact.counts(by).to_dict()
+    daily = cells.query(['date_only', 'job_title_short'])['count'].unstack(fill_value=0)
+    expected = exact.query(['date_only', 'job_title_short'])['count'].unstack(fill_value=0)
+    pd.testing.assert_frame_equal(daily, expected, check_dtype=False, check_column_type=False, check_names=False)
+    assert cells.salary_mean() == pytest.approx(exact.salary_mean())
+
+    expected_skills = skill_title_counts(SkillIndex.build(df['job_skills']), df['job_title_short'])
+    pd.testing.assert_frame_equal(store.skill_title_counts().sort_index(), expected_skills.sort_index(),
+                                  check_dtype=False, check_column_type=False, check_index_type=False)
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from aggregates import JobCube
+from progressive import ProgressiveCube, SampleCube, sample_frame
+from synthetic import generate
+
+
+@pytest.fixture(scope='module')
+def postings():
+    df = generate(200_000, seed=4)
+    df['date_only'] = df['job_posted_date'].dt.normalize()
+    for col in ['job_title_short', 'job_country', 'job_via', 'job_schedule_type']:
+        df[col] = df[col].astype('category')
+    return df
+
+
+def test_title_intervals_are_finite_and_contain_exact_counts(postings):
+    exact = JobCube.build(postings).counts('job_title_short')
+    with np.errstate(invalid='raise'):
+        bounds = SampleCube.from_sample(postings).intervals('job_title_short')
+
+    bounds = bounds.reindex(exact.index)
+    assert np.isfinite(bounds[['lower', 'upper']].to_numpy()).all()
+    assert (bounds['lower'] <= exact + 1e-6).all()
+    assert (bounds['upper'] >= exact - 1e-6).all()
+
+
+def test_filtered_intervals_are_finite(postings):
+    bounds = SampleCube.from_sample(postings).intervals('job_country', job_title_short='Data Analyst')
+    assert np.isfinite(bounds[['lower', 'upper']].to_numpy()).all()
+    assert (bounds['lower'] <= bounds['count']).all() and (bounds['count'] <= bounds['upper']).all()
+
+
+def test_progressive_cube_starts_from_a_pre_drawn_sample(postings):
+    loads = []
+
+    def load_frame():
+        loads.append(True)
+        return postings
+
+    cube = ProgressiveCube(sample_frame(postings), load_frame, background=False)
+    assert loads == [True] and cube.is_exact and cube.frame() is postings
+    assert cube.estimate.counts('job_title_short').sum() == pytest.approx(len(postings))
+    assert cube.counts('job_title_short').equals(JobCube.build(postings).counts('job_title_short'))
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from skills import MIN_PAIR_POSTINGS, SkillCooccurrence, SkillIndex, skill_list_counts, skill_title_counts
+
+
+def skill_sets(df):
+    """Each posting's set of skills, parsed directly with pandas string methods."""
+    return df['job_skills'].astype(object).str.findall(r"'([^']+)'").map(
+        lambda skills: set(skills) if isinstance(skills, list) else set())
+
+
+@pytest.mark.parametrize('skills', [['python'], ['python', 'sql'], ['sql', 'aws', 'excel'], ['no such skill']])
+@pytest.mark.parametrize('match', ['any', 'all'])
+def test_lookup_matches_a_pandas_filter(postings, skills, match):
+    sets = skill_sets(postings)
+    if match == 'any':
+        expected = sets.map(lambda listed: bool(listed & set(skills)))
+    else:
+        expected = sets.map(lambda listed: set(skills) <= listed)
+
+    index = SkillIndex.build(postings['job_skills'])
+    np.testing.assert_array_equal(index.lookup(skills, match), np.flatnonzero(expected.to_numpy()))
+    np.testing.assert_array_equal(index.mask(skills, match), expected.to_numpy())
+
+
+def test_skill_counts_match_value_counts(postings):
+    expected = skill_sets(postings).explode().dropna().value_counts()
+    counts = SkillIndex.build(postings['job_skills']).skill_counts()
+    pd.testing.assert_series_equal(counts.sort_index(), expected.sort_index(), check_dtype=False, check_names=False)
+
+
+def test_lookup_rejects_unknown_match(postings):
+    with pytest.raises(ValueError):
+        SkillIndex.build(postings['job_skills']).lookup(['python'], match='some')
+
+
+def test_skill_title_counts_match_a_crosstab(postings):
+    pairs = pd.DataFrame({'skill': skill_sets(postings), 'job_title_short': postings['job_title_short'].astype(str)})
+    pairs = pairs.explode('skill').dropna()
+    expected = pd.crosstab(pairs['skill'], pairs['job_title_short'])
+
+    counts = skill_title_counts(SkillIndex.build(postings['job_skills']), postings['job_title_short'])
+    counts = counts.loc[:, counts.sum() > 0]
+    pd.testing.assert_frame_equal(counts.sort_index(), expected.sort_index(), check_dtype=False,
+                                  check_names=False, check_column_type=False, check_index_type=False)
+
+
+def expected_related(df, skills, job_title, min_count):
+    """related() computed from the postings' skill sets with plain pandas."""
+    if job_title is not None:
+        df = df[df['job_title_short'] == job_title]
+    sets = skill_sets(df)
+    totals = sets.explode().dropna().value_counts()
+    rows = {}
+    for candidate in totals.index.difference(skills):
+        together = np.array([sets.map(lambda listed: {skill, candidate} <= listed).sum() for skill in skills])
+        if (together < min_count).any():
+            continue
+        selected_totals = totals[skills].to_numpy()
+        pmi = np.log2(together * len(df) / (selected_totals * totals[candidate])).mean()
+        rows[candidate] = {'share': (together / selected_totals).mean(), 'lift': 2 ** pmi, 'pmi': pmi,
+                           'together': together.min(), 'postings': totals[candidate]}
+    return pd.DataFrame.from_dict(rows, orient='index', columns=['share', 'lift', 'pmi', 'together', 'postings'])
+
+
+@pytest.mark.parametrize('skills, job_title', [(['python'], None), (['sql', 'tableau'], None), (['python'], 'Data Scientist')])
+@pytest.mark.parametrize('min_count', [MIN_PAIR_POSTINGS, 60])
+def test_related_matches_pandas_lift_and_pmi(postings, skills, job_title, min_count):
+    expected = expected_related(postings, skills, job_title, min_count)
+    # The app builds from distinct (skill list, title) pairs weighted by postings; both must agree
+    lists = skill_list_counts(postings)
+    for cooccurrence in [SkillCooccurrence.build(postings['job_skills'], postings['job_title_short']),
+                         SkillCooccurrence.build(lists['job_skills'], lists['job_title_short'], lists['count'])]:
+        related = cooccurrence.related(skills, job_title, top=len(cooccurrence.names), min_count=min_count)
+        assert sorted(related.index) == sorted(expected.index)
+        pd.testing.assert_frame_equal(related.sort_index(), expected.sort_index(), check_dtype=False,
+                                      check_names=False, check_index_type=False)
+        assert related['pmi'].is_monotonic_decreasing
+
+
+def test_min_pair_postings_drops_rare_pairs(postings):
+    cooccurrence = SkillCooccurrence.build(postings['job_skills'], postings['job_title_short'])
+    everything = cooccurrence.related(['python'], 'Cloud Engineer', top=1000, min_count=1)
+    related = cooccurrence.related(['python'], 'Cloud Engineer', top=1000)
+    rare = everything[everything['together'] < MIN_PAIR_POSTINGS]
+    assert len(rare) and (related['together'] >= MIN_PAIR_POSTINGS).all()
+    assert sorted(related.index) == sorted(everything.index.difference(rare.index))
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import JobCube
+from skills import SkillIndex
+from synthetic import generate
+
+sql_store = pytest.importorskip('sql_store')
+
+
+@pytest.fixture
+def postings(tmp_path):
+    df = generate(5_000, seed=21)
+    rng = np.random.default_rng(22)
+    # Raw skill lists mix case and padding, e.g. "['Python', ' sql ']"
+    messy = rng.random(len(df)) < 0.3
+    df.loc[messy, 'job_skills'] = df.loc[messy, 'job_skills'].str.replace("'python'", "'Python '", regex=False)
+    df.loc[messy, 'job_skills'] = df.loc[messy, 'job_skills'].str.replace("'sql'", "' SQL'", regex=False)
+    df['date_only'] = df['job_posted_date'].dt.normalize()
+    path = str(tmp_path / 'postings.parquet')
+    df.to_parquet(path, index=False)
+    return df, sql_store.SqlStore(path)
+
+
+def test_skill_queries_match_the_pandas_backend(postings):
+    df, store = postings
+    index = SkillIndex.build(df['job_skills'])
+    assert 'Python ' not in index.names and ' SQL' not in index.names
+
+    expected = index.skill_counts()
+    pd.testing.assert_series_equal(store.skill_counts().sort_index(), expected.sort_index(),
+                                   check_dtype=False, check_names=False)
+
+    cube = JobCube.build(df)
+    for skills, match in [(['python'], 'any'), (['python', 'sql'], 'all'), (['sql', 'aws'], 'any')]:
+        exact = cube.subset(index.lookup(skills, match)).counts('job_title_short')
+        counts = store.subset(store.lookup(skills, match)).counts('job_title_short')
+        assert counts.to_dict() == exact[exact > 0].to_dict()
@@ -0,0 +1,127 @@
+import argparse
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from cleaning import OUTPUT_PATH
+from data_store import load_dataset
+from forecasts import cached_forecast_table
+from model_registry import MODEL_DIR, read_manifest, save_model, write_manifest
+
+PLOT_DIR = 'forecast_plots'
+COUNTRY_MODEL_DIR = os.path.join(MODEL_DIR, 'countries')
+COUNTRY_PLOT_DIR = os.path.join(PLOT_DIR, 'countries')
+
+
+def monthly_series(df, by):
+    """Monthly posting counts per group, resampled to daily with forward fill as in Modeling.ipynb."""
+    months = df['job_posted_date'].dt.to_period('M').rename('month')
+    monthly = df.groupby([months] + by, observed=True).size().unstack(by, fill_value=0)
+    monthly.index = monthly.index.to_timestamp()
+
+    series = {}
+    for key in monthly.columns:
+        name = key if isinstance(key, str) else ' - '.join(key)
+        daily = monthly[key].resample('D').ffill()
+        series[name] = pd.DataFrame({'ds': daily.index, 'y': daily.values})
+    return series
+
+
+def series_fingerprint(series):
+    digest = hashlib.sha256()
+    digest.update(series['ds'].values.astype('datetime64[ns]').tobytes())
+    digest.update(series['y'].values.astype('float64').tobytes())
+    return digest.hexdigest()[:16]
+
+
+def save_plot(fig, path):
+    tmp_path = path + '.tmp'
+    fig.savefig(tmp_path, format='png')
+    os.replace(tmp_path, path)
+
+
+def fit_one(name, series, fingerprint, model_dir, plot_dir, previous_entry):
+    """Fit one Prophet model and write its model, forecast table and plots. Runs in a worker process."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from prophet import Prophet
+
+    start = time.perf_counter()
+    model = Prophet()
+    model.fit(series)
+
+    manifest = {name: previous_entry} if previous_entry else {}
+    entry = save_model(model, name, model_dir, manifest, series_fingerprint=fingerprint)
+
+    # Fill the app's forecast cache for the new version, which also drops the job's older forecasts
+    cached_forecast_table(name, entry['sha256'][:16], lambda: model)
+
+    os.makedirs(plot_dir, exist_ok=True)
+    forecast = model.predict(model.make_future_dataframe(periods=365))
+    fig = model.plot(forecast)
+    fig.gca().set_title(f'Forecasted Daily Job Postings for {name}')
+    save_plot(fig, os.path.join(plot_dir, f'{name}_forecast.png'))
+    plt.close(fig)
+    fig = model.plot_components(forecast)
+    save_plot(fig, os.path.join(plot_dir, f'{name}_weekly_forecast.png'))
+    plt.close(fig)
+
+    return name, entry, time.perf_counter() - start
+
+
+def train(df, model_dir, plot_dir, by, workers=None, force=False, only=None):
+    """Fit every series whose fingerprint changed since the last run, in parallel, and update the manifest."""
+    os.makedirs(model_dir, exist_ok=True)
+    manifest = read_manifest(model_dir)
+    series = monthly_series(df, by)
+    if only:
+        series = {name: s for name, s in series.items() if name in only}
+
+    jobs = {}
+    for name, s in series.items():
+        fingerprint = series_fingerprint(s)
+        entry = manifest.get(name)
+        if not force and entry and entry.get('series_fingerprint') == fingerprint \
+                and os.path.exists(os.path.join(model_dir, entry['file'])):
+            print(f'  skip  {name} (series unchanged)')
+            continue
+        jobs[name] = (s, fingerprint, entry)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(fit_one, name, s, fingerprint, model_dir, plot_dir, entry)
+                   for name, (s, fingerprint, entry) in jobs.items()]
+        for future in as_completed(futures):
+            name, entry, seconds = future.result()
+            manifest[name] = entry
+            write_manifest(manifest, model_dir)
+            print(f'  fit   {name} ({seconds:.1f}s)')
+    return manifest
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train the per-title Prophet forecast models.')
+    parser.add_argument('data', nargs='?', default=OUTPUT_PATH)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: one per CPU)')
+    parser.add_argument('--force', action='store_true', help='refit even when the input series is unchanged')
+    parser.add_argument('--titles', nargs='*', help='only fit these job titles')
+    parser.add_argument('--countries', nargs='*', help='also fit per-country models for these countries')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = load_dataset(args.data)
+
+    print('Job title models:')
+    train(df, MODEL_DIR, PLOT_DIR, ['job_title_short'], args.workers, args.force, args.titles)
+
+    if args.countries:
+        print('Country models:')
+        df_countries = df[df['job_country'].isin(args.countries)]
+        if args.titles:
+            df_countries = df_countries[df_countries['job_title_short'].isin(args.titles)]
+        train(df_countries, COUNTRY_MODEL_DIR, COUNTRY_PLOT_DIR, ['job_title_short', 'job_country'], args.workers, args.force)
+
+    print(f'Done in {time.perf_counter() - start:.1f}s')
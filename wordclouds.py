@@ -0,0 +1,16 @@
+import io
+
+
+def wordcloud_image(frequencies, width=800, height=400, background_color='white'):
+    """Word cloud built directly from a term -> count mapping, with no text tokenization."""
+    from wordcloud import WordCloud
+
+    frequencies = {str(term): float(count) for term, count in frequencies.items() if count > 0}
+    return WordCloud(width=width, height=height, background_color=background_color).generate_from_frequencies(frequencies)
+
+
+def wordcloud_png(frequencies, width=800, height=400, background_color='white'):
+    """Rendered word cloud as PNG bytes, suitable for caching."""
+    buffer = io.BytesIO()
+    wordcloud_image(frequencies, width, height, background_color).to_image().save(buffer, format='PNG')
+    return buffer.getvalue()